@@ -1,69 +1,254 @@
+import asyncio
+import hashlib
+import heapq
+import logging
+import mimetypes
 import os
-import io
-from openai import OpenAI
+import subprocess
+import tempfile
+from openai import APIConnectionError, APIStatusError, AsyncOpenAI, RateLimitError
 from dotenv import load_dotenv
+from tenacity import (
+    retry,
+    retry_if_exception,
+    stop_after_attempt,
+    wait_random_exponential,
+)
+from tqdm import tqdm
 
 load_dotenv()
 
-# Initialize the OpenAI client
-client = OpenAI()
+logger = logging.getLogger(__name__)
 
+# Initialize the async OpenAI client; retries are handled by tenacity below
+client = AsyncOpenAI(max_retries=0)
 
-# Function to split a file into chunks of a specific size
-def split_file(file_path, chunk_size_bytes=20 * 1024 * 1024):  # Default 20MB chunks
-    # Get total file size
-    file_size = os.path.getsize(file_path)
-    chunks = []
-
-    with open(file_path, "rb") as f:
-        # Read and yield chunks
-        for i in range(0, file_size, chunk_size_bytes):
-            # Read the chunk
-            f.seek(i)
-            chunk_data = f.read(min(chunk_size_bytes, file_size - i))
-            chunks.append(chunk_data)
-
-    return chunks
-
-
-# Function to transcribe audio chunks
-def transcribe_audio(file_path, chunk_size_mb=20):
-    # Convert MB to bytes
-    chunk_size_bytes = chunk_size_mb * 1024 * 1024
+# How many chunks are uploaded at once, and attempts per chunk on transient errors
+MAX_CONCURRENT_CHUNKS = 8
+MAX_ATTEMPTS = 6
 
-    # Split the file
-    print(f"Splitting file into {chunk_size_mb}MB chunks...")
-    chunks = split_file(file_path, chunk_size_bytes)
-    print(f"File split into {len(chunks)} chunks")
+# Chunks smaller than this (about a quarter second of audio) are not sent
+MIN_CHUNK_BYTES = 4096
 
-    # Initialize an empty string to store the transcription
-    full_transcript = ""
 
-    # Process each chunk
-    for i, chunk_data in enumerate(chunks):
-        try:
-            print(f"Transcribing chunk {i+1}/{len(chunks)}...")
+# Function to get the file extension chunks of an audio file are saved with
+def audio_extension(file_path):
+    return os.path.splitext(file_path)[1] or ".mp3"
 
-            # Create a file-like object from the bytes
-            chunk_file = io.BytesIO(chunk_data)
-            chunk_file.name = f"chunk_{i}.mp3"  # Give it a name for OpenAI's API
 
-            # Transcribe the chunk
-            transcript = client.audio.transcriptions.create(
-                model="whisper-1", file=chunk_file
-            )
+# Function to get the duration of an audio file in seconds
+def probe_duration(file_path):
+    result = subprocess.run(
+        [
+            "ffprobe",
+            "-v",
+            "error",
+            "-show_entries",
+            "format=duration",
+            "-of",
+            "default=noprint_wrappers=1:nokey=1",
+            file_path,
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(result.stdout)
 
-            # Add to full transcript
-            full_transcript += transcript.text + " "
 
-        except Exception as e:
-            print(f"Error transcribing chunk {i+1}: {e}")
+# Function to split an audio file into self-contained pieces of at most
+# roughly chunk_size_bytes each. Cutting at raw byte offsets would break MP3
+# frames, so ffmpeg splits on frame boundaries, copying the stream as is.
+def iter_chunks(file_path, chunk_size_bytes=20 * 1024 * 1024):  # Default 20MB chunks
+    file_size = os.path.getsize(file_path)
+    if file_size <= chunk_size_bytes:
+        with open(file_path, "rb") as f:
+            yield f.read()
+        return
+
+    # Pick a segment length that keeps each piece under the size limit,
+    # with some headroom for variable bitrate
+    duration = probe_duration(file_path)
+    segment_time = max(1, int(duration * chunk_size_bytes / file_size * 0.9))
+    extension = audio_extension(file_path)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        subprocess.run(
+            [
+                "ffmpeg",
+                "-v",
+                "error",
+                "-i",
+                file_path,
+                "-f",
+                "segment",
+                "-segment_time",
+                str(segment_time),
+                "-c",
+                "copy",
+                os.path.join(tmp_dir, f"chunk_%04d{extension}"),
+            ],
+            check=True,
+        )
+        for name in sorted(os.listdir(tmp_dir)):
+            with open(os.path.join(tmp_dir, name), "rb") as f:
+                yield f.read()
+
+
+# Function to tell transient API errors from permanent ones. It covers what
+# the SDK's own retries (turned off above) would retry: rate limits, dropped
+# connections and timeouts, 408/409 responses and server errors.
+def is_transient(error):
+    if isinstance(error, (RateLimitError, APIConnectionError)):
+        return True
+    if isinstance(error, APIStatusError):
+        return error.status_code >= 500 or error.status_code in (408, 409)
+    return False
+
+
+# Function to transcribe one chunk. Transient errors are retried with jittered
+# exponential backoff, so concurrent workers do not all retry at the same
+# moment; the retries happen inside the worker, so they never exceed
+# MAX_CONCURRENT_CHUNKS requests in flight.
+@retry(
+    retry=retry_if_exception(is_transient),
+    wait=wait_random_exponential(min=1, max=60),
+    stop=stop_after_attempt(MAX_ATTEMPTS),
+    reraise=True,
+)
+async def transcribe_chunk(i, chunk_data, extension=".mp3"):
+    # Pass the bytes with a name and MIME type matching the source format,
+    # so OpenAI's API knows how to decode them
+    file_name = f"chunk_{i}{extension}"
+    mime_type = mimetypes.guess_type(file_name)[0] or "application/octet-stream"
+    transcript = await client.audio.transcriptions.create(
+        model="whisper-1", file=(file_name, chunk_data, mime_type)
+    )
+    return transcript.text
+
+
+# Function to append one chunk's text and a separating space to a file.
+# writev sends both buffers in a single syscall without concatenating them.
+def write_text(fd, text):
+    data = text.encode("utf-8")
+    if hasattr(os, "writev"):
+        os.writev(fd, [data, b" "])
+    else:  # Windows has no writev
+        os.write(fd, data + b" ")
+
+
+# Function to transcribe audio chunks concurrently while the file is read.
+# With out_path, each chunk's text is appended to that file, in chunk order,
+# as soon as it and all earlier chunks are done, and out_path is returned;
+# otherwise the whole transcript is returned as a string.
+async def transcribe_audio(file_path, chunk_size_mb=20, out_path=None):
+    # Convert MB to bytes
+    chunk_size_bytes = chunk_size_mb * 1024 * 1024
 
-    return full_transcript.strip()
+    # A bounded queue caps how many chunks are held in memory at once
+    queue = asyncio.Queue(maxsize=MAX_CONCURRENT_CHUNKS)
+    loop = asyncio.get_running_loop()
+    # Chunks keep the source format, so they are uploaded under its extension
+    extension = audio_extension(file_path)
+    texts = {}
+    # Transcription of each distinct chunk content, keyed by its blake2b
+    # digest, so identical chunks are only sent (and billed) once
+    transcriptions = {}
+    errors = []
+    skipped = 0
+
+    # Chunks finished out of order wait in a heap until every earlier chunk
+    # is done, so the file is always a complete, ordered prefix
+    fd = None
+    if out_path is not None:
+        fd = os.open(out_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_APPEND)
+    pending = []
+    next_index = 0
+
+    def emit(i, text):
+        nonlocal next_index
+        if fd is None:
+            if text.strip():
+                texts[i] = text
+            return
+
+        heapq.heappush(pending, (i, text))
+        while pending and pending[0][0] == next_index:
+            _, ready = heapq.heappop(pending)
+            if ready.strip():
+                write_text(fd, ready)
+            next_index += 1
+
+    # One progress bar for all workers; its total is known once the file is read
+    progress = tqdm(desc="Whisper", unit="chunk")
+
+    # Producer: read chunks off the event loop and hand them to the workers
+    async def produce():
+        chunks = iter_chunks(file_path, chunk_size_bytes)
+        i = 0
+        try:
+            while chunk_data := await loop.run_in_executor(None, next, chunks, None):
+                await queue.put((i, chunk_data))
+                i += 1
+            progress.total = i
+            progress.refresh()
+        finally:
+            # Always stop the workers, even if reading the file failed
+            for _ in range(MAX_CONCURRENT_CHUNKS):
+                await queue.put(None)
+
+    # Workers: upload chunks as soon as they are read
+    async def work():
+        nonlocal skipped
+        while (item := await queue.get()) is not None:
+            i, chunk_data = item
+            if len(chunk_data) < MIN_CHUNK_BYTES:
+                # Too short to contain speech
+                skipped += 1
+                progress.set_postfix(skipped=skipped)
+                progress.update()
+                emit(i, "")
+                continue
+
+            digest = hashlib.blake2b(chunk_data, digest_size=16).digest()
+            if digest not in transcriptions:
+                transcriptions[digest] = asyncio.ensure_future(
+                    transcribe_chunk(i, chunk_data, extension)
+                )
+            try:
+                text = await transcriptions[digest]
+            except Exception as e:
+                errors.append((i, e))
+                text = ""
+            progress.update()
+            emit(i, text)
+
+    try:
+        await asyncio.gather(produce(), *(work() for _ in range(MAX_CONCURRENT_CHUNKS)))
+    finally:
+        progress.close()
+        if fd is not None:
+            os.close(fd)
+
+    # Report all failed chunks together once the bar is done
+    if errors:
+        logger.error(
+            "Failed to transcribe %d chunk(s): %s",
+            len(errors),
+            "; ".join(f"chunk {i+1}: {e}" for i, e in sorted(errors)),
+        )
+
+    if out_path is not None:
+        return out_path
+
+    # Join the non-empty texts in chunk order
+    return " ".join(texts[i] for i in sorted(texts))
 
 
 # Main execution
-audio_file_path = "disposition_and_sentencing_12-07-2018.mp3"
-transcript = transcribe_audio(audio_file_path)
-print("\nFull Transcript:")
-print(transcript)
+if __name__ == "__main__":
+    audio_file_path = "disposition_and_sentencing_12-07-2018.mp3"
+    # Long recordings are written to disk as they are transcribed
+    transcript_path = os.path.splitext(audio_file_path)[0] + ".txt"
+    asyncio.run(transcribe_audio(audio_file_path, out_path=transcript_path))
+    print(f"\nFull transcript written to {transcript_path}")
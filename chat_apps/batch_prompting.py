@@ -0,0 +1,76 @@
+"""Batch helpers: answer several questions with one LLM call or in parallel"""
+
+import re
+import uuid
+from typing import Any, Dict, List, Optional
+
+# Sentinel that ends a batch early (a blank line also ends it)
+SEND_COMMAND = "/send"
+
+# Command that reads N independent questions and sends them concurrently
+BATCH_COMMAND = "/batch"
+
+# Session ids of /batch questions start with this; such sessions are throwaway
+BATCH_SESSION_PREFIX = "batch-"
+
+_ANSWER_MARKER = re.compile(r"^\s*\[(\d+)\]\s*", re.MULTILINE)
+
+
+def collect_batch(first_line: str, prompt: str = "... ") -> List[str]:
+    """Read questions until a blank line or /send, starting with first_line."""
+    prompts = [first_line]
+    while True:
+        line = input(prompt).strip()
+        if not line or line == SEND_COMMAND:
+            return prompts
+        prompts.append(line)
+
+
+def format_batch_prompt(prompts: List[str]) -> str:
+    """Combine the questions into one prompt with [i] tags."""
+    questions = "\n".join(f"[{i}] {p}" for i, p in enumerate(prompts, start=1))
+    return (
+        "Answer each of the following questions separately. Start every answer "
+        "on a new line with the tag of its question, formatted as '[i] answer'."
+        f"\n\n{questions}"
+    )
+
+
+def split_batch_response(text: str, count: int) -> List[str]:
+    """Split a batched response on its [i] markers into count answers."""
+    parts = _ANSWER_MARKER.split(text)
+    if len(parts) < 3:
+        # The model ignored the format; return the whole text as one answer
+        return [text.strip()] + [""] * (count - 1)
+
+    answers = {}
+    for index, answer in zip(parts[1::2], parts[2::2]):
+        answers.setdefault(int(index), answer.strip())
+    return [answers.get(i, "") for i in range(1, count + 1)]
+
+
+def parse_batch_command(user_input: str) -> Optional[int]:
+    """Return N if user_input is a '/batch N' command, otherwise None."""
+    parts = user_input.split()
+    if len(parts) == 2 and parts[0] == BATCH_COMMAND and parts[1].isdigit():
+        return int(parts[1]) or None
+    return None
+
+
+def read_prompts(count: int, prompt: str = "... ") -> List[str]:
+    """Read count questions from stdin, one per line."""
+    return [input(prompt) for _ in range(count)]
+
+
+def is_batch_session(session_id: str) -> bool:
+    """Return True if session_id was made by batch_configs."""
+    return session_id.startswith(BATCH_SESSION_PREFIX)
+
+
+def batch_configs(count: int, **extra: Any) -> List[Dict[str, Any]]:
+    """Build one run config per question, each with its own fresh chat session."""
+    # A new id per call, so no batch sees the history of an earlier one
+    prefix = f"{BATCH_SESSION_PREFIX}{uuid.uuid4().hex}-"
+    return [
+        {"configurable": {"session_id": f"{prefix}{i}"}, **extra} for i in range(count)
+    ]
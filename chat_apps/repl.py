@@ -0,0 +1,82 @@
+"""Shared helpers for the interactive chat REPLs"""
+
+import asyncio
+import os
+import sys
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+T = TypeVar("T")
+
+# Inputs that end a chat session (compared after strip().lower())
+EXIT_COMMANDS = frozenset({"exit", "quit", "q"})
+
+
+async def run_blocking(func: Callable[..., T], *args: Any) -> T:
+    """Run a blocking call (such as reading stdin) on a daemon thread.
+
+    The default executor is avoided on purpose: asyncio.run waits for its
+    threads on shutdown, so a thread stuck in input() would keep Ctrl-C from
+    ending the program.
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def resolve(result: Any, error: Optional[BaseException]) -> None:
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def target() -> None:
+        try:
+            result, error = func(*args), None
+        except BaseException as e:
+            result, error = None, e
+        try:
+            loop.call_soon_threadsafe(resolve, result, error)
+        except RuntimeError:
+            # The loop closed while the call was blocked
+            pass
+
+    threading.Thread(target=target, daemon=True).start()
+    return await future
+
+
+async def ainput(prompt: str = "") -> str:
+    """Read a line from stdin without blocking the event loop."""
+    return await run_blocking(input, prompt)
+
+
+async def stream_reply(chain: Any, inputs: Dict[str, Any], config: Any) -> str:
+    """Print the chain's reply as it is generated and return the full text."""
+    pieces = []
+    async for chunk in chain.astream(inputs, config=config):
+        print(chunk.content, end="", flush=True)
+        pieces.append(chunk.content)
+    print()
+    return "".join(pieces)
+
+
+def run(main: Awaitable[T], interrupt_message: str = "") -> Optional[T]:
+    """Run the REPL coroutine, on uvloop's faster event loop when installed.
+
+    Ctrl-C prints interrupt_message and exits at once. A reader thread may
+    still be blocked in input() holding stdin, so the interpreter's normal
+    shutdown is skipped.
+    """
+    try:
+        if uvloop is not None:
+            return uvloop.run(main)
+        return asyncio.run(main)
+    except KeyboardInterrupt:
+        print(f"\n{interrupt_message}" if interrupt_message else "", flush=True)
+        sys.stderr.flush()
+        os._exit(130)
@@ -0,0 +1,284 @@
+"""Chat message history that summarizes old messages over a token limit"""
+
+import asyncio
+import io
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import tiktoken
+from langchain_core.chat_history import BaseChatMessageHistory
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage, SystemMessage
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.prompts import (
+    ChatPromptTemplate,
+    HumanMessagePromptTemplate,
+    MessagesPlaceholder,
+)
+from langchain_core.runnables import RunnableConfig, RunnableWithMessageHistory
+
+# Handle both direct execution and module import
+try:
+    from .batch_prompting import is_batch_session
+except ImportError:
+    # Fallback for direct execution
+    from chat_apps.batch_prompting import is_batch_session
+
+# Shared tokenizer used for token counting, so no chat model is needed for it
+_ENC = tiktoken.encoding_for_model("gpt-4o-mini")
+
+# Summarization prompt, built once and shared by every history instance.
+# It extends the previous summary with only the messages added since.
+_SUMMARIZE_PROMPT = ChatPromptTemplate.from_messages(
+    [
+        (
+            "system",
+            "Update the conversation summary with the new messages. Keep it to "
+            "1-2 sentences, focusing on key information.\n\n"
+            "Existing summary: {prev}\n\nNew messages:\n{text}\n\nUpdated summary:",
+        )
+    ]
+)
+
+
+def _count(text: str) -> int:
+    """Return the number of tokens in text."""
+    return len(_ENC.encode(text))
+
+
+class SummarizingMessageHistory(BaseChatMessageHistory):
+    """Chat message history that summarizes old messages when token limit is exceeded."""
+
+    def __init__(
+        self, chat_model: BaseChatModel, max_tokens: int = 30, verbose: bool = True
+    ):
+        self.messages = []
+        self.max_tokens = max_tokens
+        self.verbose = verbose
+        self.current_summary = None
+        # Number of leading messages already folded into current_summary
+        self._summarized_up_to = 0
+        self._summarize_chain = _SUMMARIZE_PROMPT | chat_model | StrOutputParser()
+        # Token count per message, keyed by id(message), computed once on add
+        self._token_cache: Dict[int, int] = {}
+        # Running total of the cached counts, so totals are O(1) per turn
+        self._total_tokens = 0
+        # Background summarization started after the last turn: (length, task)
+        self._prefetch: Optional[Tuple[int, asyncio.Task]] = None
+        # Last result of get_messages_for_llm: ((length, total tokens), messages)
+        self._last: Optional[Tuple[Tuple[int, int], List[BaseMessage]]] = None
+        # Serializes summary updates; made on first use inside the event loop
+        self._summary_lock: Optional[asyncio.Lock] = None
+        # Output of background summarization, held until the next turn so it
+        # does not land in the middle of the user's input line
+        self._pending_output: List[str] = []
+
+    def add_message(self, message: BaseMessage) -> None:
+        """Add a message to the history."""
+        self.messages.append(message)
+        count = _count(message.content)
+        self._token_cache[id(message)] = count
+        self._total_tokens += count
+
+    def add_messages(self, messages: Sequence[BaseMessage]) -> None:
+        """Add several messages, tokenizing them in one batch call."""
+        counts = map(len, _ENC.encode_batch([m.content for m in messages]))
+        for message, count in zip(messages, counts):
+            self.messages.append(message)
+            self._token_cache[id(message)] = count
+            self._total_tokens += count
+
+    def clear(self) -> None:
+        """Clear the message history."""
+        self.messages = []
+        self.current_summary = None
+        self._summarized_up_to = 0
+        self._token_cache = {}
+        self._total_tokens = 0
+        self._cancel_prefetch()
+        self._last = None
+        self._pending_output = []
+
+    def get_messages(self) -> List[BaseMessage]:
+        """Return messages, implementing the required interface method."""
+        return self.messages
+
+    def token_count(self, message: BaseMessage) -> int:
+        """Return the token count of a message, using the cache when possible."""
+        count = self._token_cache.get(id(message))
+        if count is None:
+            count = _count(message.content)
+        return count
+
+    def total_tokens(self) -> int:
+        """Return the total token count of all messages in the history."""
+        return self._total_tokens
+
+    def _needs_summary(self) -> bool:
+        """Return True if the history is over the token limit and long enough."""
+        return self._total_tokens > self.max_tokens and len(self.messages) >= 4
+
+    def _cancel_prefetch(self) -> None:
+        """Cancel and forget the background summarization, if any."""
+        if self._prefetch is not None:
+            self._prefetch[1].cancel()
+            self._prefetch = None
+
+    def maybe_summarize(self) -> None:
+        """Start summarizing in the background if the next turn will need it."""
+        self._cancel_prefetch()
+        if self._needs_summary():
+            task = asyncio.create_task(self._build_messages_for_llm(background=True))
+            self._prefetch = (len(self.messages), task)
+
+    async def get_messages_for_llm(self) -> List[BaseMessage]:
+        """Return messages for LLM, with summarization if needed."""
+        # Repeated calls within a turn see the same history; answer from memo
+        key = (len(self.messages), self._total_tokens)
+        if self._last is not None and self._last[0] == key:
+            self._flush_output()
+            return self._last[1]
+
+        # Reuse the background summarization if no message was added since;
+        # otherwise it summarized a stale history and is dropped
+        prefetch, self._prefetch = self._prefetch, None
+        if prefetch is not None and prefetch[0] == key[0]:
+            result = await prefetch[1]
+        else:
+            if prefetch is not None:
+                prefetch[1].cancel()
+            result = await self._build_messages_for_llm()
+        self._flush_output()
+        self._last = (key, result)
+        return result
+
+    def _report(self, text: str, background: bool) -> None:
+        """Print text now, or hold it for the next turn if in the background."""
+        if background:
+            self._pending_output.append(text)
+        else:
+            print(text)
+
+    def _flush_output(self) -> None:
+        """Print the output held back by background summarization."""
+        if self._pending_output:
+            print("\n".join(self._pending_output))
+            self._pending_output = []
+
+    async def _build_messages_for_llm(
+        self, background: bool = False
+    ) -> List[BaseMessage]:
+        """Build the message list for the LLM, summarizing old messages."""
+        # Fast path: nothing to summarize, skip all formatting work
+        if not self._needs_summary():
+            return self.messages
+
+        if self.verbose:
+            self._report(
+                f"Messages: {len(self.messages)}, "
+                f"Tokens: {self._total_tokens}/{self.max_tokens}",
+                background,
+            )
+
+        # Keep the last 2 messages (recent user-assistant exchange)
+        summarize_up_to = len(self.messages) - 2
+        recent_messages = self.messages[summarize_up_to:]
+
+        if self._summary_lock is None:
+            self._summary_lock = asyncio.Lock()
+        # One update at a time, each extending the summary the last one left
+        async with self._summary_lock:
+            # Fold only the messages added since the last summary into it
+            new_messages = self.messages[self._summarized_up_to : summarize_up_to]
+            if new_messages:
+                summary = await self._generate_summary(new_messages, background)
+                if summary is None:
+                    return self.messages
+                self.current_summary = summary
+                self._summarized_up_to = summarize_up_to
+
+        # Return: [summary as system message] + [recent messages]
+        return [
+            SystemMessage(
+                content=f"Previous conversation summary: {self.current_summary}"
+            ),
+            *recent_messages,
+        ]
+
+    async def _generate_summary(
+        self, messages: List[BaseMessage], background: bool = False
+    ) -> Optional[str]:
+        """Extend the current summary with the given messages, None on failure."""
+        buf = io.StringIO()
+        for msg in messages:
+            buf.write(msg.type)
+            buf.write(": ")
+            buf.write(msg.content)
+            buf.write("\n")
+
+        if self.verbose:
+            self._report("Summarizing conversation history...", background)
+
+        try:
+            summary = await self._summarize_chain.ainvoke(
+                {"prev": self.current_summary or "None", "text": buf.getvalue()}
+            )
+        except Exception as e:
+            self._report(f"Summarization failed: {e}", background)
+            return None
+
+        if self.verbose:
+            self._report(f"Summary: {summary}", background)
+        return summary
+
+
+class CustomRunnableWithHistory(RunnableWithMessageHistory):
+    """RunnableWithMessageHistory that sends the summarized history to the LLM."""
+
+    async def _aenter_history(
+        self, value: Dict[str, Any], config: RunnableConfig
+    ) -> List[BaseMessage]:
+        """Load the history, using summarization if available."""
+        history_obj = config["configurable"]["message_history"]
+
+        if hasattr(history_obj, "get_messages_for_llm"):
+            return list(await history_obj.get_messages_for_llm())
+
+        return await super()._aenter_history(value, config)
+
+
+def make_chain(
+    chat_model: BaseChatModel, max_tokens: int = 30, verbose: bool = True
+) -> CustomRunnableWithHistory:
+    """Build a chat chain with one summarizing history per session.
+
+    The same chat model answers the user and writes the summaries. Use
+    chain.get_session_history(session_id) to reach a session's history.
+    """
+    session_histories: Dict[str, SummarizingMessageHistory] = {}
+
+    def get_chat_history(session_id: str) -> SummarizingMessageHistory:
+        """Return the chat history for a given session ID."""
+        # /batch questions are independent, so their histories are not kept
+        if is_batch_session(session_id):
+            return SummarizingMessageHistory(
+                chat_model, max_tokens=max_tokens, verbose=verbose
+            )
+        if session_id not in session_histories:
+            session_histories[session_id] = SummarizingMessageHistory(
+                chat_model, max_tokens=max_tokens, verbose=verbose
+            )
+        return session_histories[session_id]
+
+    prompt = ChatPromptTemplate(
+        [
+            MessagesPlaceholder(variable_name="chat_history"),
+            HumanMessagePromptTemplate.from_template("{content}"),
+        ]
+    )
+
+    return CustomRunnableWithHistory(
+        prompt | chat_model,
+        get_chat_history,
+        input_messages_key="content",
+        history_messages_key="chat_history",
+    )
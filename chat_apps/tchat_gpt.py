@@ -3,15 +3,34 @@ from langchain_core.prompts import (
     MessagesPlaceholder,
     HumanMessagePromptTemplate,
 )
-from langchain_core.messages import SystemMessage
+from langchain_core.messages import (
+    SystemMessage,
+    message_to_dict,
+    messages_from_dict,
+)
 from langchain_core.runnables import RunnableWithMessageHistory
-from langchain_community.chat_message_histories import FileChatMessageHistory
+from langchain_core.chat_history import (
+    BaseChatMessageHistory,
+    InMemoryChatMessageHistory,
+)
 from dotenv import load_dotenv
+import json
+import os
 from colorama import Fore, Style, init
 
 # Handle both direct execution and module import
 try:
     from ..config import get_llm
+    from .batch_prompting import (
+        batch_configs,
+        collect_batch,
+        format_batch_prompt,
+        is_batch_session,
+        parse_batch_command,
+        read_prompts,
+        split_batch_response,
+    )
+    from .repl import EXIT_COMMANDS, ainput, run, run_blocking, stream_reply
 except ImportError:
     # Fallback for direct execution
     import sys
@@ -19,6 +38,16 @@ except ImportError:
 
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     from config import get_llm
+    from chat_apps.batch_prompting import (
+        batch_configs,
+        collect_batch,
+        format_batch_prompt,
+        is_batch_session,
+        parse_batch_command,
+        read_prompts,
+        split_batch_response,
+    )
+    from chat_apps.repl import EXIT_COMMANDS, ainput, run, run_blocking, stream_reply
 
 load_dotenv()
 
@@ -27,9 +56,54 @@ init(autoreset=True)
 
 llm = get_llm("deepseek")
 
+# Collect several questions (ended by a blank line or /send) into one LLM call
+BATCH_MODE = False
+
+
+class AppendingFileChatMessageHistory(BaseChatMessageHistory):
+    """Chat history persisted as an append-only JSON-lines file
+
+    The file is replayed once on start-up; each new message appends a single
+    line instead of rewriting the whole history.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self._messages = []
+        if os.path.exists(file_path):
+            with open(file_path, "r", encoding="utf-8") as f:
+                self._messages = messages_from_dict(
+                    [json.loads(line) for line in f if line.strip()]
+                )
+
+    @property
+    def messages(self):
+        return list(self._messages)
 
-def get_chat_history(session_id: str) -> FileChatMessageHistory:
-    return FileChatMessageHistory(file_path=f"chat_history_{session_id}.json")
+    def add_message(self, message) -> None:
+        self._messages.append(message)
+        with open(self.file_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(message_to_dict(message)) + "\n")
+
+    def clear(self) -> None:
+        self._messages = []
+        open(self.file_path, "w", encoding="utf-8").close()
+
+
+# One history object per session, so the file is not re-read on every turn
+chat_histories = {}
+
+
+def get_chat_history(session_id: str) -> BaseChatMessageHistory:
+    # /batch questions are independent: give each an empty history that is
+    # neither written to disk nor kept for later turns
+    if is_batch_session(session_id):
+        return InMemoryChatMessageHistory()
+    if session_id not in chat_histories:
+        chat_histories[session_id] = AppendingFileChatMessageHistory(
+            file_path=f"chat_history_{session_id}.jsonl"
+        )
+    return chat_histories[session_id]
 
 
 # Modern style (recommended)
@@ -62,20 +136,61 @@ chain_with_history = RunnableWithMessageHistory(
     history_messages_key="chat_history",
 )
 
-print(f"{Fore.CYAN}🤖 AI Chat Assistant - Type 'quit' to exit{Style.RESET_ALL}")
-print(f"{Fore.YELLOW}{'='*50}{Style.RESET_ALL}")
-
-while True:
-    user_input = input(f"{Fore.GREEN}👤 You: {Style.RESET_ALL}")
+# Run config shared by every turn; LangChain copies it per call
+_INVOKE_CONFIG = {"configurable": {"session_id": "default"}}
 
-    if user_input.lower() in ["quit", "exit", "q"]:
-        print(f"{Fore.CYAN}👋 Goodbye!{Style.RESET_ALL}")
-        break
-
-    result = chain_with_history.invoke(
-        {"content": user_input}, config={"configurable": {"session_id": "default"}}
-    )
+async def chat():
+    """Main chat loop"""
     print(
-        f"{Fore.BLUE}🤖 {getattr(llm, 'model_name', None) or getattr(llm, 'model', 'AI')}: {Style.RESET_ALL}{result.content}"
+        f"{Fore.CYAN}🤖 AI Chat Assistant - Type 'quit' to exit, "
+        f"'/batch N' for parallel questions{Style.RESET_ALL}"
     )
-    print(f"{Fore.YELLOW}{'-'*50}{Style.RESET_ALL}")
+    print(f"{Fore.YELLOW}{'='*50}{Style.RESET_ALL}")
+
+    while True:
+        user_input = await ainput(f"{Fore.GREEN}👤 You: {Style.RESET_ALL}")
+
+        if user_input.strip().lower() in EXIT_COMMANDS:
+            print(f"{Fore.CYAN}👋 Goodbye!{Style.RESET_ALL}")
+            break
+
+        batch_size = parse_batch_command(user_input)
+        if batch_size:
+            # Send the independent questions concurrently, one session each
+            prompts = await run_blocking(read_prompts, batch_size)
+            results = await chain_with_history.abatch(
+                [{"content": p} for p in prompts], config=batch_configs(batch_size)
+            )
+            for question, result in zip(prompts, results):
+                print(f"{Fore.BLUE}🤖 {question}: {Style.RESET_ALL}{result.content}")
+            print(f"{Fore.YELLOW}{'-'*50}{Style.RESET_ALL}")
+            continue
+
+        if BATCH_MODE:
+            prompts = await run_blocking(collect_batch, user_input)
+            if len(prompts) > 1:
+                # Answer all collected questions with a single LLM call
+                result = await chain_with_history.ainvoke(
+                    {"content": format_batch_prompt(prompts)},
+                    config=_INVOKE_CONFIG,
+                )
+                answers = split_batch_response(result.content, len(prompts))
+                for question, answer in zip(prompts, answers):
+                    print(f"{Fore.BLUE}🤖 {question}: {Style.RESET_ALL}{answer}")
+                print(f"{Fore.YELLOW}{'-'*50}{Style.RESET_ALL}")
+                continue
+
+        print(
+            f"{Fore.BLUE}🤖 {getattr(llm, 'model_name', None) or getattr(llm, 'model', 'AI')}: {Style.RESET_ALL}",
+            end="",
+        )
+        await stream_reply(chain_with_history, {"content": user_input}, _INVOKE_CONFIG)
+        print(f"{Fore.YELLOW}{'-'*50}{Style.RESET_ALL}")
+
+
+def main():
+    run(chat(), f"{Fore.CYAN}👋 Goodbye!{Style.RESET_ALL}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+from collections import deque
+
 from langchain_core.prompts import (
     ChatPromptTemplate,
     MessagesPlaceholder,
@@ -8,6 +10,16 @@ from langchain_core.messages import SystemMessage
 # Handle both direct execution and module import
 try:
     from ..config import get_llm
+    from .batch_prompting import (
+        batch_configs,
+        collect_batch,
+        format_batch_prompt,
+        is_batch_session,
+        parse_batch_command,
+        read_prompts,
+        split_batch_response,
+    )
+    from .repl import EXIT_COMMANDS, ainput, run, run_blocking, stream_reply
 except ImportError:
     # Fallback for direct execution
     import sys
@@ -15,8 +27,18 @@ except ImportError:
 
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     from config import get_llm
+    from chat_apps.batch_prompting import (
+        batch_configs,
+        collect_batch,
+        format_batch_prompt,
+        is_batch_session,
+        parse_batch_command,
+        read_prompts,
+        split_batch_response,
+    )
+    from chat_apps.repl import EXIT_COMMANDS, ainput, run, run_blocking, stream_reply
 from langchain_core.runnables import RunnableWithMessageHistory
-from langchain_community.chat_message_histories import ChatMessageHistory
+from langchain_core.chat_history import BaseChatMessageHistory
 from langchain_core.callbacks import BaseCallbackHandler
 from dotenv import load_dotenv
 from colorama import Fore, Style, init
@@ -29,8 +51,14 @@ init(autoreset=True)
 
 
 class DebugCallbackHandler(BaseCallbackHandler):
+    def __init__(self, debug: bool = True):
+        # When False every hook returns before doing any formatting
+        self.debug = debug
+
     def on_llm_start(self, serialized, prompts, **kwargs):
         """Print messages when LLM starts running"""
+        if not self.debug:
+            return
         print("\n\n========= LLM Input =========")
         for prompt in prompts:
             print(prompt)
@@ -40,9 +68,37 @@ class DebugCallbackHandler(BaseCallbackHandler):
 # Create debug flag
 DEBUG_MODE = True
 
+# Collect several questions (ended by a blank line or /send) into one LLM call
+BATCH_MODE = False
+
+
+# Number of recent human/AI exchanges kept in the history sent to the LLM
+HISTORY_WINDOW = 10
+
+
+class WindowedMessageHistory(BaseChatMessageHistory):
+    """In-memory chat history that keeps only the last `window` exchanges
+
+    Older messages drop off the front of a bounded deque, so memory use and
+    the prompt size stay constant however long the session runs.
+    """
+
+    def __init__(self, window: int = HISTORY_WINDOW):
+        self._messages = deque(maxlen=2 * window)
+
+    @property
+    def messages(self):
+        return list(self._messages)
+
+    def add_message(self, message) -> None:
+        self._messages.append(message)
+
+    def clear(self) -> None:
+        self._messages.clear()
+
 
 # Initialize callback handler for debugging
-debug_callbacks = [DebugCallbackHandler()] if DEBUG_MODE else []
+debug_callbacks = [DebugCallbackHandler(DEBUG_MODE)] if DEBUG_MODE else []
 
 # Initialize ChatOpenAI model with remote model from openai
 llm = get_llm("remote")
@@ -50,12 +106,17 @@ llm = get_llm("remote")
 # remote_chat_model = remote_chat_model.with_callbacks(debug_callbacks)
 
 
-# Create an in-memory message history
-message_history = ChatMessageHistory()
+# Create a windowed in-memory message history per session
+message_histories = {}
 
 
-def get_chat_history(session_id: str) -> ChatMessageHistory:
-    return message_history
+def get_chat_history(session_id: str) -> WindowedMessageHistory:
+    # /batch questions are independent, so their histories are not kept
+    if is_batch_session(session_id):
+        return WindowedMessageHistory()
+    if session_id not in message_histories:
+        message_histories[session_id] = WindowedMessageHistory()
+    return message_histories[session_id]
 
 
 # Modern style (recommended)
@@ -77,22 +138,65 @@ chain_with_history = RunnableWithMessageHistory(
     history_messages_key="chat_history",
 )
 
-print(
-    f"{Fore.CYAN}🤖 AI Chat Assistant (In-Memory) - Type 'quit' to exit{Style.RESET_ALL}"
-)
-print(f"{Fore.YELLOW}{'='*50}{Style.RESET_ALL}")
-
-while True:
-    user_input = input(f"{Fore.GREEN}👤 You: {Style.RESET_ALL}")
+# Run config shared by every turn; LangChain copies it per call
+_INVOKE_CONFIG = {
+    "configurable": {"session_id": "default"},
+    "callbacks": debug_callbacks,
+}
 
-    if user_input.lower() in ["quit", "exit", "q"]:
-        print(f"{Fore.CYAN}👋 Goodbye!{Style.RESET_ALL}")
-        break
-
-    result = chain_with_history.invoke(
-        {"content": user_input}, config={"configurable": {"session_id": "default"}}
-    )
+async def chat():
+    """Main chat loop"""
     print(
-        f"{Fore.BLUE}🤖 {getattr(llm, 'model_name', None) or getattr(llm, 'model', 'AI')}: {Style.RESET_ALL}{result.content}"
+        f"{Fore.CYAN}🤖 AI Chat Assistant (In-Memory) - Type 'quit' to exit, "
+        f"'/batch N' for parallel questions{Style.RESET_ALL}"
     )
-    print(f"{Fore.YELLOW}{'-'*50}{Style.RESET_ALL}")
+    print(f"{Fore.YELLOW}{'='*50}{Style.RESET_ALL}")
+
+    while True:
+        user_input = await ainput(f"{Fore.GREEN}👤 You: {Style.RESET_ALL}")
+
+        if user_input.strip().lower() in EXIT_COMMANDS:
+            print(f"{Fore.CYAN}👋 Goodbye!{Style.RESET_ALL}")
+            break
+
+        batch_size = parse_batch_command(user_input)
+        if batch_size:
+            # Send the independent questions concurrently, one session each
+            prompts = await run_blocking(read_prompts, batch_size)
+            results = await chain_with_history.abatch(
+                [{"content": p} for p in prompts],
+                config=batch_configs(batch_size, callbacks=debug_callbacks),
+            )
+            for question, result in zip(prompts, results):
+                print(f"{Fore.BLUE}🤖 {question}: {Style.RESET_ALL}{result.content}")
+            print(f"{Fore.YELLOW}{'-'*50}{Style.RESET_ALL}")
+            continue
+
+        if BATCH_MODE:
+            prompts = await run_blocking(collect_batch, user_input)
+            if len(prompts) > 1:
+                # Answer all collected questions with a single LLM call
+                result = await chain_with_history.ainvoke(
+                    {"content": format_batch_prompt(prompts)},
+                    config=_INVOKE_CONFIG,
+                )
+                answers = split_batch_response(result.content, len(prompts))
+                for question, answer in zip(prompts, answers):
+                    print(f"{Fore.BLUE}🤖 {question}: {Style.RESET_ALL}{answer}")
+                print(f"{Fore.YELLOW}{'-'*50}{Style.RESET_ALL}")
+                continue
+
+        print(
+            f"{Fore.BLUE}🤖 {getattr(llm, 'model_name', None) or getattr(llm, 'model', 'AI')}: {Style.RESET_ALL}",
+            end="",
+        )
+        await stream_reply(chain_with_history, {"content": user_input}, _INVOKE_CONFIG)
+        print(f"{Fore.YELLOW}{'-'*50}{Style.RESET_ALL}")
+
+
+def main():
+    run(chat(), f"{Fore.CYAN}👋 Goodbye!{Style.RESET_ALL}")
+
+
+if __name__ == "__main__":
+    main()
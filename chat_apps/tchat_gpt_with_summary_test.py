@@ -21,6 +21,7 @@ from typing import List, Optional, Any, Dict, Callable
 from dotenv import load_dotenv
 import asyncio
 import logging
+import tiktoken
 
 
 # Configure logging
@@ -40,14 +41,26 @@ load_dotenv()
 # Initialize the chat model first
 llm = get_llm("remote")
 
+# Tokenizer for the debug token counts
+_ENC = tiktoken.encoding_for_model("gpt-4o-mini")
+
+
+def count_tokens(texts: List[str]) -> int:
+    """Return the total token count of texts, encoded in one batch call."""
+    return sum(map(len, _ENC.encode_batch(texts)))
+
 
 class DebugCallbackHandler(BaseCallbackHandler):
-    def __init__(self):
+    def __init__(self, debug: bool = True):
         self._last_chain_input = None
+        # When False every hook returns before doing any formatting
+        self.debug = debug
 
     def on_llm_start(self, serialized, messages, **kwargs):
+        if not self.debug:
+            return
         log_message = "\n========= Final LLM Input =========\n"
-        token_count = sum(llm.get_num_tokens(str(msg)) for msg in messages)
+        token_count = count_tokens([str(msg) for msg in messages])
         log_message += f"Token count: {token_count}\n"
         log_message += f"Number of messages: {len(messages)}\n"
         log_message += "\nActual content being sent to LLM:\n"
@@ -58,6 +71,8 @@ class DebugCallbackHandler(BaseCallbackHandler):
         print(log_message)
 
     def on_chain_start(self, serialized, inputs, **kwargs):
+        if not self.debug:
+            return
         # Avoid duplicate logs by checking the input content
         current_input = (
             f"{inputs.get('content', '')}{str(inputs.get('chat_history', ''))}"
@@ -71,9 +86,7 @@ class DebugCallbackHandler(BaseCallbackHandler):
             history_messages = inputs["chat_history"]
             if history_messages:
                 log_message += f"\nChat History ({len(history_messages)} messages):\n"
-                total_tokens = sum(
-                    llm.get_num_tokens(msg.content) for msg in history_messages
-                )
+                total_tokens = count_tokens([msg.content for msg in history_messages])
                 log_message += f"Total history tokens: {total_tokens}\n"
                 for msg in history_messages:
                     log_message += f"{msg.type}: {msg.content}\n"
@@ -90,7 +103,7 @@ class DebugCallbackHandler(BaseCallbackHandler):
 DEBUG_MODE = True
 
 # Initialize callback handler for debugging
-debug_callbacks = [DebugCallbackHandler()] if DEBUG_MODE else []
+debug_callbacks = [DebugCallbackHandler(DEBUG_MODE)] if DEBUG_MODE else []
 
 # Update the chat model with callbacks
 llm = get_llm("remote")
@@ -132,7 +145,7 @@ class SummarizingMessageHistory(BaseChatMessageHistory):
     async def get_messages_for_llm(self) -> List[BaseMessage]:
         """Return messages for LLM, with summarization if needed"""
         # Calculate token count for all messages
-        total_tokens = sum(llm.get_num_tokens(msg.content) for msg in self.messages)
+        total_tokens = count_tokens([msg.content for msg in self.messages])
 
         log_message = f"\n=== Message History Stats ===\n"
         log_message += f"Number of messages: {len(self.messages)}\n"
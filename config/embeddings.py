@@ -1,8 +1,29 @@
 """Embedding configurations for different providers"""
 
+from typing import Optional
+
+from langchain.embeddings import CacheBackedEmbeddings
+from langchain.storage import LocalFileStore
 from langchain_openai import OpenAIEmbeddings
 from langchain_huggingface import HuggingFaceEmbeddings
 
+from .onnx_embeddings import OnnxEmbeddings
+
+
+def _cpu_has_bf16() -> bool:
+    """Return True if the CPU computes in bfloat16 natively (AVX512-BF16/AMX)."""
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            flags = f.read().split()
+    except OSError:
+        return False
+    return "avx512_bf16" in flags or "amx_bf16" in flags
+
+
+# bfloat16 weights halve the memory traffic of the matmuls, but CPUs without
+# native bf16 emulate it and run slower, so it is only used where supported
+LOCAL_DTYPE = "bfloat16" if _cpu_has_bf16() else "float32"
+
 # Embedding configurations
 EMBEDDING_CONFIGS = {
     "openai": {
@@ -13,8 +34,19 @@ EMBEDDING_CONFIGS = {
         "class": HuggingFaceEmbeddings,
         "kwargs": {
             "model_name": "all-MiniLM-L6-v2",
-            "model_kwargs": {"device": "cpu"},
-            "encode_kwargs": {"normalize_embeddings": True},
+            "model_kwargs": {
+                "device": "cpu",
+                "model_kwargs": {"torch_dtype": LOCAL_DTYPE},
+            },
+            # Larger batches amortize per-call overhead across more texts
+            "encode_kwargs": {"normalize_embeddings": True, "batch_size": 128},
+        },
+    },
+    # Same model as "local", exported to ONNX and quantized to int8
+    "local_onnx": {
+        "class": OnnxEmbeddings,
+        "kwargs": {
+            "model_name": "sentence-transformers/all-MiniLM-L6-v2",
         },
     },
     # Easy to add more configurations
@@ -39,7 +71,7 @@ def get_embeddings(embedding_type: str):
     """Get embeddings instance based on embedding type
     
     Args:
-        embedding_type: One of 'openai', 'local', 'openai_large', 'local_multilingual'
+        embedding_type: One of 'openai', 'local', 'local_onnx', 'openai_large', 'local_multilingual'
         
     Returns:
         Initialized embeddings instance
@@ -55,6 +87,42 @@ def get_embeddings(embedding_type: str):
     return config["class"](**config["kwargs"])
 
 
+def embedding_dtype(embedding_type: str) -> Optional[str]:
+    """Return the torch dtype a local embedding model runs in, else None
+
+    Vectors from different dtypes differ slightly, so caches and stores built
+    from them should not be mixed.
+    """
+    kwargs = EMBEDDING_CONFIGS[embedding_type]["kwargs"]
+    model_kwargs = kwargs.get("model_kwargs", {}).get("model_kwargs", {})
+    return model_kwargs.get("torch_dtype")
+
+
+def get_cached_embeddings(embedding_type: str):
+    """Get embeddings instance whose document vectors are cached on disk
+
+    Vectors are stored in .emb_cache_<embedding_type>, keyed by a hash of the
+    text, so re-embedding unchanged chunks skips the model or API call. The
+    namespace includes the model's dtype, if set, so switching it does not
+    reuse vectors computed in the other one.
+
+    Args:
+        embedding_type: One of 'openai', 'local', 'local_onnx', 'openai_large', 'local_multilingual'
+
+    Returns:
+        CacheBackedEmbeddings wrapping the configured embeddings
+
+    Raises:
+        ValueError: If embedding_type is not recognized
+    """
+    store = LocalFileStore(f".emb_cache_{embedding_type}")
+    dtype = embedding_dtype(embedding_type)
+    namespace = f"{embedding_type}_{dtype}" if dtype else embedding_type
+    return CacheBackedEmbeddings.from_bytes_store(
+        get_embeddings(embedding_type), store, namespace=namespace
+    )
+
+
 def list_available_embeddings():
     """List all available embedding configurations"""
     return list(EMBEDDING_CONFIGS.keys())
\ No newline at end of file
@@ -0,0 +1,73 @@
+"""Sentence-transformer embeddings run as an int8-quantized ONNX model"""
+
+import os
+from typing import List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+class OnnxEmbeddings(Embeddings):
+    """Mean-pooled, L2-normalized sentence embeddings on ONNX Runtime (CPU).
+
+    The model is exported to ONNX and dynamically quantized to int8 on first
+    use, then loaded from cache_dir on later runs. Needs
+    `pip install optimum[onnxruntime]`.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+        cache_dir: str = ".onnx_all-MiniLM-L6-v2_int8",
+        batch_size: int = 32,
+    ):
+        from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+        from optimum.onnxruntime.configuration import AutoQuantizationConfig
+        from transformers import AutoTokenizer
+
+        quantized_file = "model_quantized.onnx"
+        if not os.path.exists(os.path.join(cache_dir, quantized_file)):
+            model = ORTModelForFeatureExtraction.from_pretrained(
+                model_name, export=True, provider="CPUExecutionProvider"
+            )
+            quantizer = ORTQuantizer.from_pretrained(model)
+            quantizer.quantize(
+                save_dir=cache_dir,
+                quantization_config=AutoQuantizationConfig.avx512_vnni(
+                    is_static=False, per_channel=False
+                ),
+            )
+            AutoTokenizer.from_pretrained(model_name).save_pretrained(cache_dir)
+
+        self.model = ORTModelForFeatureExtraction.from_pretrained(
+            cache_dir, file_name=quantized_file, provider="CPUExecutionProvider"
+        )
+        self.tokenizer = AutoTokenizer.from_pretrained(cache_dir)
+        self.batch_size = batch_size
+
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        """Embed one batch of texts into unit-length float32 vectors."""
+        inputs = self.tokenizer(
+            texts, padding=True, truncation=True, return_tensors="np"
+        )
+        hidden = self.model(**inputs).last_hidden_state
+
+        # Mean over the real tokens only, then normalize for cosine similarity
+        mask = inputs["attention_mask"][..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        pooled /= np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12)
+        return pooled.astype(np.float32)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts in batches of batch_size."""
+        if not texts:
+            return []
+        vectors = [
+            self._embed(texts[i : i + self.batch_size])
+            for i in range(0, len(texts), self.batch_size)
+        ]
+        return np.concatenate(vectors).tolist()
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query."""
+        return self._embed([text])[0].tolist()
@@ -7,6 +7,7 @@ for consistent logging across the application with colored output.
 
 import logging
 import logging.handlers
+import re
 import sys
 from pathlib import Path
 from typing import Optional
@@ -42,6 +43,27 @@ class ColorCodes:
     RESET = '\033[0m'
 
 
+# Two or more SGR escape sequences in a row, e.g. '\033[0m\033[92m'
+_SGR_RUN = re.compile(r'(?:\033\[[\d;]*m){2,}')
+_SGR_PARAMS = re.compile(r'\033\[([\d;]*)m')
+
+
+def _merge_sgr_run(match) -> str:
+    """Merge a run of SGR sequences into one, e.g. ESC[0m ESC[92m -> ESC[0;92m."""
+    params = [p or '0' for p in _SGR_PARAMS.findall(match.group(0))]
+    return f"\033[{';'.join(params)}m"
+
+
+def coalesce_sgr(text: str) -> str:
+    """
+    Merge adjacent ANSI SGR sequences into single sequences.
+    
+    Parameters are applied in order within one sequence, so the rendered
+    output is unchanged while fewer bytes reach the terminal.
+    """
+    return _SGR_RUN.sub(_merge_sgr_run, text)
+
+
 class ColoredFormatter(logging.Formatter):
     """Custom formatter that adds colors to log levels and different log types."""
     
@@ -284,6 +306,10 @@ def log_function_call(func_name: str, args: dict = None, result: str = None):
     """
     logger = AgentLogger.get_logger(__name__)
     
+    # Skip building the messages (and the args repr) when INFO is disabled
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    
     if args:
         logger.info(f"Calling {func_name} with args: {args}")
     else:
@@ -306,6 +332,10 @@ def log_agent_action(agent_type: str, action: str, details: dict = None):
     """
     logger = AgentLogger.get_logger(__name__)
     
+    # Skip building the message (and the details repr) when INFO is disabled
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    
     log_msg = f"Agent [{agent_type}] - {action}"
     if details:
         log_msg += f" - Details: {details}"
@@ -340,6 +370,10 @@ def log_performance(operation: str, duration: float, details: dict = None):
     """
     logger = AgentLogger.get_logger(__name__)
     
+    # Skip building the message (and the details repr) when INFO is disabled
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    
     log_msg = f"Performance - {operation}: {duration:.2f}s"
     if details:
         log_msg += f" - Details: {details}"
@@ -414,7 +448,7 @@ def colorize_result_output(text: str, force_colors: bool = True) -> str:
         colored_text
     )
     
-    return colored_text
+    return coalesce_sgr(colored_text)
 
 
 def colorize_execution_time(execution_time: float, force_colors: bool = True) -> str:
@@ -1,28 +1,44 @@
-from retreival_system_with_FAISS import retrieve
-from generative_system import generate_text
+from concurrent.futures import ThreadPoolExecutor
+
 from sample_dataset import documents
-import faiss
-from tokenization_embeddings_for_rag import document_embeddings
-from transformers import AutoTokenizer, AutoModel, AutoModelForCausalLM
+import numpy as np
 from check_relevance import is_relevant
 
-# Initialize the tokenizer and model for generation
-gen_tokenizer = AutoTokenizer.from_pretrained("gpt2")
-gen_tokenizer.pad_token = gen_tokenizer.eos_token
-gen_model = AutoModelForCausalLM.from_pretrained("gpt2")
+# Reuse the models and FAISS index that the retrieval and generation modules
+# already set up, so each checkpoint is loaded (and the index built) once
+from retreival_system_with_FAISS import (
+    index as retrieval_index,
+    model as retrieval_model,
+    retrieve,
+    tokenizer as retrieval_tokenizer,
+)
+from generative_system import (
+    generate_text,
+    generative_model as gen_model,
+    generative_tokenizer as gen_tokenizer,
+)
 
 
-# Initialize the FAISS index
-retrieval_index = faiss.IndexFlatL2(document_embeddings.shape[1])
-retrieval_index.add(document_embeddings)
+# Define the generation step of the RAG pipeline, given retrieval results
 
-# Initialize the tokenizer and model for retrieval
-retrieval_tokenizer = AutoTokenizer.from_pretrained(
-    "sentence-transformers/paraphrase-MiniLM-L6-v2"
-)
-retrieval_model = AutoModel.from_pretrained(
-    "sentence-transformers/paraphrase-MiniLM-L6-v2"
-)
+
+def answer_from_retrieval(query, retrieved_docs, distances, gen_model, gen_tokenizer):
+    # Discard all documents that do not meet the relevance criteria;
+    # is_relevant compares the whole row of distances at once
+    keep = np.flatnonzero(is_relevant(np.asarray(distances[0])))
+    relevant_docs = [retrieved_docs[i] for i in keep]
+
+    # Add a message if no retrieved_doc is relevant
+    if not relevant_docs:
+        return "No relevant documents found"
+
+    context = " ".join(relevant_docs)
+
+    generated_answer = generate_text(
+        context, query, gen_model, gen_tokenizer, max_length=100
+    )
+
+    return generated_answer
 
 
 # Define RAG function which integrates retrieval and generation
@@ -42,66 +58,62 @@ def rag_pipeline(
         query, retrieval_tokenizer, retrieval_model, retrieval_index, documents, top_k
     )
 
-    # Discard all documents that do not meet the relevance criteria
-    relevant_docs = [
-        doc
-        for doc, distance in zip(retrieved_docs, distances[0])
-        if is_relevant(distance, 40)
-    ]
-
-    # Add a message if no retrieved_doc is relevant
-    if not relevant_docs:
-        return "No relevant documents found"
-
-    context = " ".join(relevant_docs)
-
-    generated_answer = generate_text(
-        context, query, gen_model, gen_tokenizer, max_length=100
+    return answer_from_retrieval(
+        query, retrieved_docs, distances, gen_model, gen_tokenizer
     )
 
-    return generated_answer
-
-
-# Test the RAG pipeline
-# query = "What is the capital of Germany?"
-
-# generated_answer = rag_pipeline(
-#     query,
-#     retrieval_tokenizer,
-#     retrieval_model,
-#     retrieval_index,
-#     gen_model,
-#     gen_tokenizer,
-#     documents,
-#     top_k=3,
-# )
-
-# Test the RAG pipeline with multiple queries
-
-queries = [
-    "What is the capital of Germany?",
-    "What is Berlin famous for?",
-    "Who discovered the Americas?",
-    "Who is the most famous person in the world?",
-]
-
-
-for query in queries:
-    generated_answer = rag_pipeline(
-        query,  # Query to answer
-        retrieval_tokenizer,  # Tokenizer for retrieval
-        retrieval_model,  # Model for retrieval
-        retrieval_index,  # FAISS index
-        gen_model,  # Model for generation
-        gen_tokenizer,  # Tokenizer for generation
-        documents,  # List of documents to retrieve from
-        top_k=3,  # Number of documents to retrieve
-    )
-    print(f"Query: {query}\nAnswer: {generated_answer}\n")
 
+if __name__ == "__main__":
+    # Test the RAG pipeline
+    # query = "What is the capital of Germany?"
+
+    # generated_answer = rag_pipeline(
+    #     query,
+    #     retrieval_tokenizer,
+    #     retrieval_model,
+    #     retrieval_index,
+    #     gen_model,
+    #     gen_tokenizer,
+    #     documents,
+    #     top_k=3,
+    # )
+
+    # Test the RAG pipeline with multiple queries
+
+    queries = [
+        "What is the capital of Germany?",
+        "What is Berlin famous for?",
+        "Who discovered the Americas?",
+        "Who is the most famous person in the world?",
+    ]
 
-# for query in queries:
-#     retrieved_docs, distances = retrieve(
-#         query, retrieval_tokenizer, retrieval_model, retrieval_index, documents, top_k=3
-#     )
-#     print(f"Query: {query}\nRetrieved docs: {retrieved_docs}\nDistances: {distances}\n")
+    # Retrieve the documents for the next query while GPT-2 generates the
+    # answer for the current one (FAISS and torch release the GIL)
+    def prefetch(query):
+        return pool.submit(
+            retrieve,
+            query,  # Query to retrieve documents for
+            retrieval_tokenizer,  # Tokenizer for retrieval
+            retrieval_model,  # Model for retrieval
+            retrieval_index,  # FAISS index
+            documents,  # List of documents to retrieve from
+            3,  # Number of documents to retrieve
+        )
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        future = prefetch(queries[0])
+        for i, query in enumerate(queries):
+            retrieved_docs, distances = future.result()
+            if i + 1 < len(queries):
+                future = prefetch(queries[i + 1])
+
+            generated_answer = answer_from_retrieval(
+                query, retrieved_docs, distances, gen_model, gen_tokenizer
+            )
+            print(f"Query: {query}\nAnswer: {generated_answer}\n")
+
+    # for query in queries:
+    #     retrieved_docs, distances = retrieve(
+    #         query, retrieval_tokenizer, retrieval_model, retrieval_index, documents, top_k=3
+    #     )
+    #     print(f"Query: {query}\nRetrieved docs: {retrieved_docs}\nDistances: {distances}\n")
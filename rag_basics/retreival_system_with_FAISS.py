@@ -1,13 +1,16 @@
+import functools
+
 import faiss
-from tokenization_embeddings_for_rag import document_embeddings, generate_embeddings
-from transformers import AutoTokenizer, AutoModel
 from sample_dataset import documents
 
-# Initialize the tokenizer and model for generating embeddings
-tokenizer = AutoTokenizer.from_pretrained(
-    "sentence-transformers/paraphrase-MiniLM-L6-v2"
+# Reuse the tokenizer and model that embedded the documents,
+# so the checkpoint is loaded once per process
+from tokenization_embeddings_for_rag import (
+    document_embeddings,
+    generate_embeddings,
+    model,
+    tokenizer,
 )
-model = AutoModel.from_pretrained("sentence-transformers/paraphrase-MiniLM-L6-v2")
 
 # Initialize a FAISS index
 
@@ -15,11 +18,20 @@ index = faiss.IndexFlatL2(document_embeddings.shape[1])
 
 index.add(document_embeddings)
 
+# Cache query embeddings so repeated queries skip the encoder forward pass.
+# The returned array is shared between callers, so it is made read-only.
+@functools.lru_cache(maxsize=1024)
+def _embed_query(query, model, tokenizer):
+    embedding = generate_embeddings(query, model, tokenizer).cpu().numpy()
+    embedding.flags.writeable = False
+    return embedding
+
+
 # Retrieval -> create a function to retrieve information
 
 
 def retrieve(query, tokenizer, model, index, documents, top_k=3):
-    query_embedding = generate_embeddings(query, model, tokenizer)
+    query_embedding = _embed_query(query, model, tokenizer)
 
     # Search for the top k most similar documents using the index distances
     distances, indices = index.search(query_embedding, top_k)
@@ -30,8 +42,9 @@ def retrieve(query, tokenizer, model, index, documents, top_k=3):
     return retrieved_documents, distances
 
 
-# Test the retrieval function
-query = "What is the capital of Germany?"
-retrieved_documents, distances = retrieve(query, tokenizer, model, index, documents)
-# print(retrieved_documents)
-# print(distances)
+if __name__ == "__main__":
+    # Test the retrieval function
+    query = "What is the capital of Germany?"
+    retrieved_documents, distances = retrieve(query, tokenizer, model, index, documents)
+    # print(retrieved_documents)
+    # print(distances)
@@ -14,6 +14,7 @@ tokenizer = AutoTokenizer.from_pretrained(
     "sentence-transformers/paraphrase-MiniLM-L6-v2"
 )
 model = AutoModel.from_pretrained("sentence-transformers/paraphrase-MiniLM-L6-v2")
+model.eval()
 
 
 # Create a function to tokenize input and generate its embeddings
@@ -25,8 +26,8 @@ def generate_embeddings(text, model, tokenizer):
         text, return_tensors="pt", padding=True, truncation=True, max_length=512
     )
 
-    # Disable gradient calculation
-    with torch.no_grad():
+    # Disable gradient calculation and autograd bookkeeping
+    with torch.inference_mode():
         # Pass the tokenized inputs through the model to the last state
         outputs = model(**tokens)
         embeddings = outputs.last_hidden_state
@@ -36,16 +36,17 @@ def boolean_search(query: str, documents: list[str]):
     return results
 
 
-# Define search query
+if __name__ == "__main__":
+    # Define search query
 
-query = "Sailing in Split or Hvar."
+    query = "Sailing in Split or Hvar."
 
-# Perform boolean search
+    # Perform boolean search
 
-boolean_results = boolean_search(query, documents)
+    boolean_results = boolean_search(query, documents)
 
-# Print results
-for doc_id, doc in boolean_results:
-    print(f"Document {doc_id}:")
-    print(doc)
-    print("\n")
+    # Print results
+    for doc_id, doc in boolean_results:
+        print(f"Document {doc_id}:")
+        print(doc)
+        print("\n")
@@ -1,5 +1,4 @@
 import nltk
-from sample_documents import documents
 
 
 # A function to process the text which lowercases, tokenizes, removes non-alphanumeric characters and stop words
@@ -29,7 +28,10 @@ def process_text_boolean(text: str) -> list[str]:
     return processed_text
 
 
-# Process the documents and join them into a single string
-processed_text = [" ".join(process_text(doc)) for doc in documents]
+if __name__ == "__main__":
+    from sample_documents import documents
 
-# print(processed_text)
+    # Process the documents and join them into a single string
+    processed_text = [" ".join(process_text(doc)) for doc in documents]
+
+    # print(processed_text)
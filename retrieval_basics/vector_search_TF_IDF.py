@@ -1,7 +1,7 @@
 from sklearn.feature_extraction.text import TfidfVectorizer
 import numpy as np
 
-from rag_basics.text_preprocessing import process_text
+from text_preprocessing import process_text
 from sample_documents import documents
 
 
@@ -12,31 +12,41 @@ vectorizer = TfidfVectorizer()
 
 tfidf_matrix = vectorizer.fit_transform(processed_text)
 
-# Sample query
-query = "Croatia is a beautiful country"
-
-# Try the sample query in our documents
-query_vector = vectorizer.transform([query])
-
-# print(query_vector.T.toarray())
-
-results = np.dot(tfidf_matrix, query_vector.T).toarray()
-
-# print(f"The results are: {results}")
-
 
 # A function to search the documents with TF-IDF
-def search(query, vectorizer, tfidf_matrix):
-    query_vector = vectorizer.transform([query])
-    results = np.dot(tfidf_matrix, query_vector.T).toarray()
+# All queries are scored with a single sparse matmul; the result is a sparse
+# (n_documents, n_queries) matrix with one column of scores per query.
+def search(queries: list[str], vectorizer, tfidf_matrix):
+    query_matrix = vectorizer.transform(queries)
+    scores = tfidf_matrix @ query_matrix.T
+    return scores
+
+
+# A function to get the indices of the k best documents for every query
+def top_k(scores, k: int) -> list[np.ndarray]:
+    scores = scores.tocsc()
+    k = min(k, scores.shape[0])
+
+    results = []
+    for j in range(scores.shape[1]):
+        column = scores[:, j].toarray().ravel()
+        best = np.argpartition(-column, k - 1)[:k]
+        results.append(best[np.argsort(-column[best])])
     return results
 
 
-# Sort and display the function
-search_results = search(query, vectorizer, tfidf_matrix)
-sorted_results = sorted(enumerate(search_results), key=lambda x: x[1][0], reverse=True)
+if __name__ == "__main__":
+    # Sample queries
+    queries = ["Croatia is a beautiful country"]
+
+    # Search and sort the results
+    search_results = search(queries, vectorizer, tfidf_matrix)
 
-# Iterate through the results and display the documents
-for i, score in enumerate(sorted_results):
-    print(f"Document {i+1}: {documents[i]}")
-    print(f"The score is: {score[1][0]:.3f}")
+    # Iterate through the results and display the documents
+    for query_idx, (query, doc_indices) in enumerate(
+        zip(queries, top_k(search_results, len(documents)))
+    ):
+        print(f"Query: {query}")
+        for rank, doc_idx in enumerate(doc_indices):
+            print(f"Document {rank+1}: {documents[doc_idx]}")
+            print(f"The score is: {search_results[doc_idx, query_idx]:.3f}")
@@ -4,14 +4,50 @@ Test script to demonstrate colored logging functionality.
 """
 
 import os
+import queue
 import sys
 import logging
+import logging.handlers
 
 # Add the project to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from langchain_demos.utils.logging import AgentLogger, log_agent_action, log_performance, log_function_call
-from langchain_demos.config import LoggingConfig
+from langchain_agents_demo.utils.logging import AgentLogger, log_agent_action, log_performance, log_function_call
+from langchain_agents_demo.config import LoggingConfig
+
+
+def start_queue_logging(*loggers):
+    """
+    Move the handlers of the given loggers behind one QueueHandler.
+    
+    Each log call then only puts a record on a queue; a background
+    QueueListener formats and writes the records.
+    
+    Returns:
+        The started QueueListener
+    """
+    log_queue = queue.SimpleQueue()
+    handlers = []
+    for logger in loggers:
+        handlers.extend(h for h in logger.handlers if h not in handlers)
+        logger.handlers = [logging.handlers.QueueHandler(log_queue)]
+    
+    listener = logging.handlers.QueueListener(
+        log_queue, *handlers, respect_handler_level=True
+    )
+    listener.start()
+    return listener
+
+
+def section(title, listener):
+    """Write the queued log records, then print a section header."""
+    # Stopping the listener drains the queue; restart it for the next section
+    listener.stop()
+    listener.start()
+    print()
+    print(title)
+    print("-" * 30)
+
 
 def test_colored_logging():
     """Test various log levels and categories with colors."""
@@ -19,6 +55,9 @@ def test_colored_logging():
     # Force colored output for demonstration
     config = LoggingConfig(colored=True, level="DEBUG")
     logger = AgentLogger.get_logger(__name__, config)
+    # The helpers log through the utils logger; queue both
+    helpers_logger = AgentLogger.get_logger("langchain_agents_demo.utils.logging")
+    listener = start_queue_logging(logger, helpers_logger)
     
     print("🎨 Testing Colored Logging Output:")
     print("=" * 50)
@@ -30,9 +69,7 @@ def test_colored_logging():
     logger.error("This is an ERROR message")
     logger.critical("This is a CRITICAL message")
     
-    print()
-    print("Agent Action Examples:")
-    print("-" * 30)
+    section("Agent Action Examples:", listener)
     
     # Test agent actions
     log_agent_action("main", "started", {"mode": "demo", "version": "1.0"})
@@ -40,27 +77,21 @@ def test_colored_logging():
     log_agent_action("tool_calling", "agent_created", {"tools_count": 5, "agent_id": "demo_agent"})
     log_agent_action("tool_calling", "execute_query", {"query_preview": "SELECT * FROM users LIMIT 10"})
     
-    print()
-    print("Function Call Examples:")
-    print("-" * 30)
+    section("Function Call Examples:", listener)
     
     # Test function calls
     log_function_call("list_tables")
     log_function_call("describe_tables", {"table_names": ["users", "orders"]})
     log_function_call("execute_query", {"query_preview": "COUNT(*) FROM orders"})
     
-    print()
-    print("Performance Examples:")
-    print("-" * 30)
+    section("Performance Examples:", listener)
     
     # Test performance logs
     log_performance("database_connection", 0.25, {"host": "localhost", "status": "success"})
     log_performance("query_execution", 1.45, {"query_type": "SELECT", "rows_returned": 150})
     log_performance("agent_initialization", 3.22, {"tables_found": 8, "tools_loaded": 5})
     
-    print()
-    print("Mixed Content Examples:")
-    print("-" * 30)
+    section("Mixed Content Examples:", listener)
     
     logger.info("Found 6 tables in database")
     logger.info("Performance - data_processing: 2.34s - Details: {'records_processed': 1500}")
@@ -68,9 +99,7 @@ def test_colored_logging():
     logger.info("Calling execute_query with args: {'query_preview': 'How many orders are there?'}")
     logger.info("execute_query result: Returned 25 rows")
     
-    print()
-    print("Error Logging Examples (RED):")
-    print("-" * 30)
+    section("Error Logging Examples (RED):", listener)
     
     # Test error and critical logs
     logger.error("Database connection failed: Connection timeout after 30 seconds")
@@ -83,6 +112,8 @@ def test_colored_logging():
     except Exception as e:
         logger.error(f"Exception occurred: {e}", exc_info=False)  # Don't show full traceback for demo
     
+    # Write the remaining records and stop the background thread
+    listener.stop()
     print()
     print("✅ Colored logging test completed!")
 
@@ -9,7 +9,7 @@ import os
 # Add the project to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from langchain_demos.utils.logging import colorize_result_output, colorize_execution_time, ColorCodes
+from langchain_agents_demo.utils.logging import colorize_result_output, colorize_execution_time, ColorCodes
 
 def test_colorful_results():
     """Test colorful result output formatting."""
@@ -1,26 +1,12 @@
-from torch.utils.data import Dataset
-from text_gen import padded_input_ids, padded_attention_masks
+from torch.utils.data import TensorDataset
+from text_gen import get_encoded_data
 
 
-# Create a custom dataset class including data labels
-class TextDataset(Dataset):
-    def __init__(self, input_ids, attention_masks):
-        self.input_ids = input_ids
-        self.attention_masks = attention_masks
-        self.labels = input_ids.clone()
-
-    def __len__(self):
-        return len(self.input_ids)
-
-    def __getitem__(self, idx):
-        return {
-            "input_ids": self.input_ids[idx],
-            "attention_masks": self.attention_masks[idx],
-            "labels": self.labels[idx],
-        }
-
-
-# Apply the class
-dataset = TextDataset(padded_input_ids, padded_attention_masks)
+# Create the dataset including data labels
+# A TensorDataset indexes the pre-stacked tensors directly, so batching needs
+# no per-sample Python work. GPT-2 shifts the labels internally, so they
+# share the input tensor. Each item is (input_ids, attention_mask, labels).
+padded_input_ids, padded_attention_masks = get_encoded_data()
+dataset = TensorDataset(padded_input_ids, padded_attention_masks, padded_input_ids)
 
 # print(dataset[:2])
@@ -2,50 +2,20 @@ from torch.utils.data import DataLoader
 from custom_dataset_class import dataset
 import torch
 
-# Import the pre-configured tokenizer and model from text_gen.py
-from text_gen import tokenizer, model
+# Load the pre-configured tokenizer and model from text_gen.py
+from text_gen import get_model, get_tokenizer
 
-# Prepare data in batches
-dataloader = DataLoader(dataset, batch_size=2, shuffle=True)
-
-# Initialize the optimizer
-optimizer = torch.optim.AdamW(model.parameters(), lr=5e-5)
-
-# Set the model to training mode
-model.train()
-
-# Training loop
-for epoch in range(10):
-    for batch in dataloader:
-        # Get the input IDs and attention masks IDs
-        input_ids = batch["input_ids"]
-        attention_mask = batch["attention_masks"]
-        labels = batch["labels"]
-
-        # Reset the gradients
-        optimizer.zero_grad()
-
-        # Forward pass
-        outputs = model(
-            input_ids=input_ids, attention_mask=attention_mask, labels=labels
-        )
-
-        # Backward pass: compute the gradients of the loss
-        loss = outputs.loss
-        loss.backward()
-
-        # Update the weights
-        optimizer.step()
-
-        # Print the loss
-        # print(f"Epoch {epoch}, Loss: {loss.item()}")
+# Larger batches keep the matmuls big enough to use the hardware well;
+# gradients of ACCUM_STEPS batches are summed before each optimizer step
+BATCH_SIZE = 8
+ACCUM_STEPS = 2
 
 
 def generate_text_with_finetuned_model(prompt, model, tokenizer, max_length=100):
     # Encode the prompt to get the input_ids
     inputs = tokenizer.encode_plus(prompt, return_tensors="pt")
-    input_ids = inputs["input_ids"]
-    attention_mask = inputs["attention_mask"]
+    input_ids = inputs["input_ids"].to(model.device)
+    attention_mask = inputs["attention_mask"].to(model.device)
 
     # Generate text using the model
     output = model.generate(
@@ -55,12 +25,93 @@ def generate_text_with_finetuned_model(prompt, model, tokenizer, max_length=100)
     return tokenizer.decode(output[0], skip_special_tokens=True)
 
 
-# Test the function
+# Worker processes re-import this script on platforms that spawn them,
+# so all training work runs only under the __main__ guard
+def main():
+    tokenizer = get_tokenizer()
+    model = get_model()
+
+    # Train on the GPU when there is one
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    model.to(device)
+
+    # Let matmuls use TF32 tensor cores and cuDNN pick the fastest kernels
+    torch.backends.cuda.matmul.allow_tf32 = True
+    torch.backends.cudnn.benchmark = True
+
+    # Mixed precision on the GPU: bfloat16 where supported, otherwise float16.
+    # Only float16 needs the gradient scaler; on the CPU both are disabled.
+    use_amp = device.type == "cuda"
+    amp_dtype = (
+        torch.bfloat16 if use_amp and torch.cuda.is_bf16_supported() else torch.float16
+    )
+    scaler = torch.amp.GradScaler(
+        "cuda", enabled=use_amp and amp_dtype == torch.float16
+    )
+
+    # Prepare data in batches
+    # Two persistent worker processes collate batches ahead of the training
+    # loop and are reused across epochs instead of being started every epoch.
+    # Pinned memory lets the copies to the GPU run asynchronously
+    dataloader = DataLoader(
+        dataset,
+        batch_size=BATCH_SIZE,
+        shuffle=True,
+        num_workers=2,
+        persistent_workers=True,
+        prefetch_factor=4,
+        pin_memory=use_amp,
+    )
+
+    # On the GPU, compile the model so TorchInductor fuses the pointwise ops of
+    # the forward and backward passes; generation below uses the eager model
+    train_model = torch.compile(model) if device.type == "cuda" else model
+
+    # Initialize the optimizer
+    optimizer = torch.optim.AdamW(model.parameters(), lr=5e-5)
+
+    # Set the model to training mode
+    model.train()
+
+    # Training loop
+    optimizer.zero_grad(set_to_none=True)
+    for epoch in range(10):
+        for step, (input_ids, attention_mask, labels) in enumerate(dataloader, start=1):
+            # Move the input IDs, attention masks and labels to the device
+            input_ids = input_ids.to(device, non_blocking=True)
+            attention_mask = attention_mask.to(device, non_blocking=True)
+            labels = labels.to(device, non_blocking=True)
+
+            # Forward pass
+            with torch.autocast(device.type, dtype=amp_dtype, enabled=use_amp):
+                outputs = train_model(
+                    input_ids=input_ids, attention_mask=attention_mask, labels=labels
+                )
+
+            # Backward pass: accumulate the gradients of the averaged loss
+            loss = outputs.loss / ACCUM_STEPS
+            scaler.scale(loss).backward()
+
+            # Update the weights every ACCUM_STEPS batches and at the end of an epoch
+            if step % ACCUM_STEPS == 0 or step == len(dataloader):
+                scaler.step(optimizer)
+                scaler.update()
+                # Reset the gradients (dropping them is cheaper than zeroing)
+                optimizer.zero_grad(set_to_none=True)
+
+            # Print the loss
+            # print(f"Epoch {epoch}, Loss: {loss.item()}")
+
+    # Test the function
+
+    prompt = "In this research, we"
+
+    generated_text = generate_text_with_finetuned_model(
+        prompt, model, tokenizer, max_length=500
+    )
 
-prompt = "In this research, we"
+    print(generated_text)
 
-generated_text = generate_text_with_finetuned_model(
-    prompt, model, tokenizer, max_length=500
-)
 
-print(generated_text)
+if __name__ == "__main__":
+    main()
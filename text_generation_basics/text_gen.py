@@ -7,55 +7,90 @@
 
 
 # Import libraries
-from transformers import AutoTokenizer, AutoModelForCausalLM
+import copy
+import functools
+import hashlib
+from pathlib import Path
+
 import torch
-from torch.nn.utils.rnn import pad_sequence
+from transformers import AutoTokenizer, AutoModelForCausalLM
+from transformers.pytorch_utils import Conv1D
 from sample_data import data
 
 
-# Initialize the tokenizer and model
-tokenizer = AutoTokenizer.from_pretrained("gpt2")
-model = AutoModelForCausalLM.from_pretrained("gpt2")
-
-prompt = "Dear, boss ... "
-
-# Tokenization
-# All inputs must have the same length
-# Add a dummy token to the end
-# Having the same length => this is called padding
-tokenizer.pad_token = tokenizer.eos_token
-
-# Tokenize the data
-tokenized_data = [
-    tokenizer.encode_plus(
-        sentence,
-        add_special_tokens=True,
-        return_tensors="pt",
-        padding="max_length",
-        max_length=50,
+TOKENIZER_NAME = "gpt2"
+
+
+# Load the tokenizer and model on first use, once per process,
+# so importing this module does not load GPT-2
+@functools.lru_cache(maxsize=1)
+def get_tokenizer():
+    tokenizer = AutoTokenizer.from_pretrained(TOKENIZER_NAME, use_fast=True)
+
+    # Tokenization
+    # All inputs must have the same length
+    # Add a dummy token to the end
+    # Having the same length => this is called padding
+    tokenizer.pad_token = tokenizer.eos_token
+    return tokenizer
+
+
+# SDPA runs attention as one fused scaled_dot_product_attention kernel
+@functools.lru_cache(maxsize=1)
+def get_model():
+    return AutoModelForCausalLM.from_pretrained("gpt2", attn_implementation="sdpa")
+
+
+# Padding goes to the longest sentence (capped at 50 tokens), with the
+# eos token as padding and an attention mask of 0 over the padding
+ENCODE_KWARGS = {
+    "add_special_tokens": True,
+    "padding": "longest",
+    "truncation": True,
+    "max_length": 50,
+}
+
+
+# Tokenize the whole dataset in one batched call
+# Returns the padded input IDs and attention masks
+# The tensors are saved next to this file, keyed by a hash of the tokenizer
+# name, the encoding settings and the data, so later runs skip the tokenizer
+# until one of them changes
+@functools.lru_cache(maxsize=1)
+def get_encoded_data():
+    settings = (TOKENIZER_NAME, sorted(ENCODE_KWARGS.items()), data)
+    key = hashlib.blake2b(repr(settings).encode(), digest_size=16).hexdigest()
+    cache = Path(__file__).with_name(f"_padded_cache_{key}.pt")
+    if cache.exists():
+        return torch.load(cache, weights_only=True)
+
+    encoded_data = get_tokenizer()(data, return_tensors="pt", **ENCODE_KWARGS)
+
+    # print(encoded_data["input_ids"][:2])
+
+    padded = (encoded_data["input_ids"], encoded_data["attention_mask"])
+    torch.save(padded, cache)
+    return padded
+
+
+# Int8 copy of the model for CPU inference
+# GPT-2 implements its attention and MLP projections as Conv1D layers, which
+# quantize_dynamic does not handle, so they are first converted to the
+# equivalent nn.Linear layers (Conv1D stores the transposed weight)
+def quantize_for_cpu(model):
+    model = copy.deepcopy(model)
+    for module in list(model.modules()):
+        for name, child in module.named_children():
+            if isinstance(child, Conv1D):
+                in_features, out_features = child.weight.shape
+                linear = torch.nn.Linear(in_features, out_features)
+                linear.weight.data = child.weight.data.t().contiguous()
+                linear.bias.data = child.bias.data
+                setattr(module, name, linear)
+
+    return torch.quantization.quantize_dynamic(
+        model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True
     )
-    for sentence in data
-]
-
-# print(tokenized_data[:2])
-
-# Isolate the input IDs and attention masks
-input_ids = [item["input_ids"].squeeze() for item in tokenized_data]
-attention_masks = [item["attention_mask"].squeeze() for item in tokenized_data]
-
-# Convert the input IDs and attention masks to tensors
-# This step is necessary for processing the tuned model
-input_ids = torch.stack(input_ids)
-attention_masks = torch.stack(attention_masks)
-
-# Padding all sequences to make sure they are the same length
-padded_input_ids = pad_sequence(
-    input_ids, batch_first=True, padding_value=tokenizer.eos_token_id
-)
-
-padded_attention_masks = pad_sequence(
-    attention_masks, batch_first=True, padding_value=0
-)
 
 
 # Improved text generation function with proper attention mask
@@ -68,16 +103,22 @@ def generate_text(prompt, model, tokenizer, max_new_tokens=100):
         truncation=True,
     )
 
-    input_ids = encoded["input_ids"]
-    attention_mask = encoded["attention_mask"]
+    input_ids = encoded["input_ids"].to(model.device)
+    attention_mask = encoded["attention_mask"].to(model.device)
 
     # Generate text using the model with attention mask
-    output = model.generate(
-        input_ids=input_ids,
-        attention_mask=attention_mask,
-        max_new_tokens=max_new_tokens,
-        pad_token_id=tokenizer.eos_token_id,
-    )
+    # Greedy decoding that reuses cached keys/values for each new token,
+    # without autograd bookkeeping
+    with torch.inference_mode():
+        output = model.generate(
+            input_ids=input_ids,
+            attention_mask=attention_mask,
+            max_new_tokens=max_new_tokens,
+            use_cache=True,
+            do_sample=False,
+            num_beams=1,
+            pad_token_id=tokenizer.eos_token_id,
+        )
 
     # Decode the generated text
     generated_text = tokenizer.decode(output[0], skip_special_tokens=True)
@@ -85,6 +126,17 @@ def generate_text(prompt, model, tokenizer, max_new_tokens=100):
     return generated_text
 
 
-# Generate text
-generated_text = generate_text(prompt, model, tokenizer)
-# print(generated_text)
+if __name__ == "__main__":
+    prompt = "Dear, boss ... "
+
+    # Inference only: evaluation mode, half precision on the GPU and
+    # int8 weights on the CPU
+    model = get_model().eval()
+    if torch.cuda.is_available():
+        model = model.to("cuda").half()
+    else:
+        model = quantize_for_cpu(model)
+
+    # Generate text
+    generated_text = generate_text(prompt, model, get_tokenizer())
+    # print(generated_text)
@@ -1,5 +1,9 @@
+import functools
 import os
+import threading
+from itertools import groupby
 import oracledb
+from cachetools import TTLCache, cached
 from typing import List
 from dotenv import load_dotenv
 from pydantic import BaseModel, Field
@@ -15,17 +19,40 @@ ORACLE_PASSWORD = os.getenv("ORACLE_PASSWORD")
 DSN = f"{ORACLE_HOST}:{ORACLE_PORT}/{ORACLE_SERVICE}"
 
 
+# Connection pool, created on first use so importing needs no database
+@functools.lru_cache(maxsize=1)
+def _get_pool():
+    return oracledb.create_pool(
+        user=ORACLE_USER, password=ORACLE_PASSWORD, dsn=DSN, min=2, max=10, increment=1
+    )
+
+
+# Closing a pooled connection (or leaving its `with` block) releases it
+# back to the pool instead of tearing down the session
 def get_db_connection():
-    return oracledb.connect(user=ORACLE_USER, password=ORACLE_PASSWORD, dsn=DSN)
+    return _get_pool().acquire()
+
+
+# Schema lookups change rarely, so keep them for 5 minutes: the table list
+# under the ("list_tables",) key, and the columns of each table under its name
+_schema_cache = TTLCache(maxsize=128, ttl=300)
+_schema_lock = threading.Lock()
+
+# Statements that change the schema and so invalidate the cache
+_DDL_PREFIXES = ("CREATE", "ALTER", "DROP", "RENAME", "TRUNCATE")
+
+
+def clear_schema_cache():
+    """Forget cached table lists and column descriptions, e.g. after DDL."""
+    with _schema_lock:
+        _schema_cache.clear()
 
 
+@cached(_schema_cache, key=lambda: ("list_tables",), lock=_schema_lock)
 def list_tables():
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT table_name FROM user_tables")
-    rows = cursor.fetchall()
-    cursor.close()
-    conn.close()
+    with get_db_connection() as conn, conn.cursor() as cursor:
+        cursor.execute("SELECT table_name FROM user_tables")
+        rows = cursor.fetchall()
     return "\n".join([row[0] for row in rows if row[0] is not None])
 
 
@@ -37,23 +64,50 @@ class DescribeTablesArgs(BaseModel):
 @tool(args_schema=DescribeTablesArgs)
 def describe_tables(table_names: List[str]) -> str:
     """Given a list of Oracle table names, return their column names and data types."""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    output = ""
+    if not table_names:
+        return ""
+
+    # Take what the cache has; only the missing tables go to the database
+    columns = {}
+    with _schema_lock:
+        for table in table_names:
+            name = table.upper()
+            if name in _schema_cache:
+                columns[name] = _schema_cache[name]
+    pending = [
+        table
+        for table in dict.fromkeys(t.upper() for t in table_names)
+        if table not in columns
+    ]
+
+    if pending:
+        # Fetch the columns of all missing tables in one round-trip,
+        # using bind variables
+        binds = {f"n{i}": table for i, table in enumerate(pending)}
+        placeholders = ", ".join(f":{name}" for name in binds)
+        with get_db_connection() as conn, conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT table_name, column_name, data_type FROM user_tab_columns "
+                f"WHERE table_name IN ({placeholders}) ORDER BY table_name, column_id",
+                binds,
+            )
+            fetched = {
+                table: [row[1:] for row in rows]
+                for table, rows in groupby(cursor.fetchall(), key=lambda row: row[0])
+            }
+        with _schema_lock:
+            for table in pending:
+                columns[table] = _schema_cache[table] = fetched.get(table, [])
+
+    parts = []
     for table in table_names:
-        cursor.execute(
-            f"SELECT column_name, data_type FROM user_tab_columns WHERE table_name = '{table.upper()}'"
-        )
-        rows = cursor.fetchall()
-        output += f"Table: {table}\n"
+        rows = columns.get(table.upper())
+        parts.append(f"Table: {table}\n")
         if rows:
-            for row in rows:
-                output += f"  {row[0]}: {row[1]}\n"
+            parts.extend(f"  {column}: {data_type}\n" for column, data_type in rows)
         else:
-            output += "  No columns found.\n"
-    cursor.close()
-    conn.close()
-    return output
+            parts.append("  No columns found.\n")
+    return "".join(parts)
 
 
 # --- TOOL 2: Run Oracle Query ---
@@ -68,6 +122,8 @@ def run_query(query: str) -> str:
     cursor = conn.cursor()
     try:
         cursor.execute(query)
+        if query.lstrip().upper().startswith(_DDL_PREFIXES):
+            clear_schema_cache()
         if cursor.description:
             result = cursor.fetchall()
             return str(result)
@@ -80,4 +136,4 @@ def run_query(query: str) -> str:
         conn.close()
 
 
-__all__ = ["run_query", "describe_tables", "list_tables"]
+__all__ = ["run_query", "describe_tables", "list_tables", "clear_schema_cache"]
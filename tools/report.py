@@ -3,7 +3,7 @@ from pydantic.v1 import BaseModel
 import os
 
 
-def generate_report(filename, html):
+def generate_report(filename, html, durable=False):
     # Get the current script's directory (project root)
     current_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     # Create the reports directory path
@@ -13,9 +13,13 @@ def generate_report(filename, html):
     # Create the full file path
     file_path = os.path.join(reports_dir, f"{filename}.html")
 
-    # Write the file
-    with open(file_path, "w") as f:
-        f.write(html)
+    # Encode once and write the whole file with a single write() call;
+    # fsync only when the caller asks for the report to be durable
+    with open(file_path, "wb", buffering=1024 * 1024) as f:
+        f.write(html.encode("utf-8"))
+        if durable:
+            f.flush()
+            os.fsync(f.fileno())
 
     print(f"Report saved to: {file_path}")
 
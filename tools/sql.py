@@ -1,40 +1,99 @@
+import functools
 import sqlite3
+import threading
+from cachetools import TTLCache, cached
 from langchain.tools import Tool
 from pydantic.v1 import BaseModel
 from typing import List
 
 
+# One shared connection, opened on first use and reused by every call.
+# Agents may call tools from worker threads, so every use of it goes
+# through _conn_lock.
+@functools.lru_cache(maxsize=1)
 def get_db_connection():
-    conn = sqlite3.connect("../db/db.sqlitedb")
+    conn = sqlite3.connect("../db/db.sqlitedb", check_same_thread=False)
+    # Keep up to ~20 MB of pages in memory for repeated schema scans
+    conn.execute("PRAGMA cache_size = -20000")
     return conn
 
 
+_conn_lock = threading.Lock()
+
+
+# Schema lookups change rarely, so keep them for 5 minutes: the table list
+# under the ("list_tables",) key, and the CREATE statement of each table under
+# its name
+_schema_cache = TTLCache(maxsize=128, ttl=300)
+_schema_lock = threading.Lock()
+
+# Statements that change the schema and so invalidate the cache
+_DDL_PREFIXES = ("CREATE", "ALTER", "DROP")
+
+
+def clear_schema_cache():
+    """Forget cached table lists and schemas, e.g. after DDL."""
+    with _schema_lock:
+        _schema_cache.clear()
+
+
+@cached(_schema_cache, key=lambda: ("list_tables",), lock=_schema_lock)
 def list_tables():
     conn = get_db_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-    rows = cursor.fetchall()
+    with _conn_lock:
+        cursor = conn.cursor()
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
+        rows = cursor.fetchall()
     return "\n".join([row[0] for row in rows if row[0] is not None])
 
 
 def execute_query(query):
     conn = get_db_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(query)
-        return cursor.fetchall()
-    except sqlite3.OperationalError as err:
-        return f"The following error occurred: {str(err)}"
+    with _conn_lock:
+        cursor = conn.cursor()
+        # Commit or roll back every statement, so no write lock outlives the call
+        try:
+            cursor.execute(query)
+            rows = cursor.fetchall()
+            conn.commit()
+        except sqlite3.OperationalError as err:
+            conn.rollback()
+            return f"The following error occurred: {str(err)}"
+        except Exception:
+            conn.rollback()
+            raise
+    if query.lstrip().upper().startswith(_DDL_PREFIXES):
+        clear_schema_cache()
+    return rows
 
 
 def describe_tables(table_names):
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    tables = ", ".join("'" + table + "'" for table in table_names)
-    rows = cursor.execute(
-        f"SELECT sql FROM sqlite_master WHERE type='table' AND name IN ({tables});"
-    )
-    return "\n".join([row[0] for row in rows if row[0] is not None])
+    names = list(dict.fromkeys(table_names))
+
+    # Take what the cache has; only the missing tables go to the database
+    schemas = {}
+    with _schema_lock:
+        for name in names:
+            if name in _schema_cache:
+                schemas[name] = _schema_cache[name]
+    pending = [name for name in names if name not in schemas]
+
+    if pending:
+        conn = get_db_connection()
+        placeholders = ", ".join("?" for _ in pending)
+        with _conn_lock:
+            cursor = conn.cursor()
+            rows = cursor.execute(
+                "SELECT name, sql FROM sqlite_master "
+                f"WHERE type='table' AND name IN ({placeholders});",
+                pending,
+            )
+            fetched = dict(rows.fetchall())
+        with _schema_lock:
+            for name in pending:
+                schemas[name] = _schema_cache[name] = fetched.get(name)
+
+    return "\n".join([schemas[name] for name in names if schemas[name] is not None])
 
 
 class DescribeTablesArgsSchema(BaseModel):
@@ -8,7 +8,9 @@ except ImportError:
     import os
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     from config import get_llm
+import atexit
 import os
+import httpx
 from openai import OpenAI  # OpenAI SDK
 
 load_dotenv()
@@ -20,9 +22,17 @@ remote_model_name = "gpt-4o-mini"  # remote model name for OpenAI SDK
 
 ######################################################################
 # Using OpenAI SDK
+# One pooled HTTP client keeps connections alive between requests, so the
+# TCP/TLS handshake is paid once rather than per call
+http_client = httpx.Client(
+    limits=httpx.Limits(max_keepalive_connections=20, max_connections=100)
+)
+atexit.register(http_client.close)
+
 client = OpenAI(
     base_url="http://172.18.35.123:8000/v1",  # with base_url, you can override the default base url (https://api.openai.com/v1)
     api_key=os.getenv("OPENAI_API_KEY"),
+    http_client=http_client,
 )
 # print(client.models.list())
 
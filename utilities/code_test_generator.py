@@ -61,24 +61,30 @@ test_prompt = PromptTemplate(
 code_chain = code_prompt | llm
 test_chain = test_prompt | llm
 
-# Generate code first
+def stream_content(chain, inputs):
+    """Print the chain's output as it streams in and return the full text."""
+    pieces = []
+    for chunk in chain.stream(inputs):
+        print(chunk.content, end="", flush=True)
+        pieces.append(chunk.content)
+    print()
+    return "".join(pieces)
+
+
+# Generate code first, printing it as it arrives
+# The test prompt needs the complete code, so the two calls stay sequential
 input_data = {"language": language or args.language, "task": task or args.task}
-generated_code = code_chain.invoke(input_data).content
+print(">>>>>>>>>> GENERATED CODE <<<<<<<<<<")
+generated_code = stream_content(code_chain, input_data)
 
 # Generate test using the generated code
-generated_test = test_chain.invoke({
-    "language": input_data["language"], 
-    "code": generated_code
-}).content
+print(">>>>>>>>>> GENERATED TEST <<<<<<<<<<")
+generated_test = stream_content(
+    test_chain, {"language": input_data["language"], "code": generated_code}
+)
 
 # Prepare response
 response = {
     "code": generated_code,
     "test": generated_test
 }
-
-
-print(">>>>>>>>>> GENERATED CODE <<<<<<<<<<")
-print(response["code"])
-print(">>>>>>>>>> GENERATED TEST <<<<<<<<<<")
-print(response["test"])
@@ -0,0 +1,269 @@
+"""Chunk, ingest and search the facts used by the facts vector stores"""
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+from langchain_chroma import Chroma
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.vectorstores import VectorStore
+
+# Optional Rust-backed splitter; LangChain's pure-Python one is the fallback
+try:
+    from semantic_text_splitter import TextSplitter
+except ImportError:
+    TextSplitter = None
+
+# Optional SIMD distance kernels; a NumPy matrix-vector product is the fallback
+try:
+    import simsimd
+except ImportError:
+    simsimd = None
+
+# Optional HNSW index for approximate search over large stores
+try:
+    from usearch.index import Index as HnswIndex
+except ImportError:
+    HnswIndex = None
+
+CHUNK_SIZE = 500  # Larger chunks often work better
+CHUNK_OVERLAP = 50  # Some overlap helps maintain context
+
+# Documents per embeddings request / vector store insert, and how many
+# batches are in flight at once
+INGEST_BATCH_SIZE = 256
+INGEST_WORKERS = 4
+
+# float16 copy of a store's vectors, saved inside its persist directory
+FACT_INDEX_FILE = "fact_index_f16.npz"
+
+# Below this many vectors brute-force scoring beats an HNSW graph search
+HNSW_MIN_VECTORS = 2048
+
+# Records what a persisted store was built from, to detect stale stores
+MANIFEST_FILE = "manifest.json"
+
+
+def _split(text: str, chunk_size: int, overlap: int) -> List[str]:
+    """Split text into overlapping chunks of at most chunk_size chars."""
+    if TextSplitter is not None:
+        return TextSplitter(capacity=chunk_size, overlap=overlap).chunks(text)
+
+    from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+    return RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=overlap,
+        separators=["\n\n", "\n", ".", "!", "?", ",", " ", ""],
+    ).split_text(text)
+
+
+def load_fact_chunks(
+    path: str = "facts.txt",
+    chunk_size: int = CHUNK_SIZE,
+    overlap: int = CHUNK_OVERLAP,
+) -> List[Document]:
+    """Read path once and split it into overlapping chunks of chunk_size chars.
+
+    Uses semantic_text_splitter when it is installed, which runs the
+    recursive splitting in native code, and RecursiveCharacterTextSplitter
+    otherwise. The split is memoized in .chunks_<hash>.pkl, keyed by the
+    text and the splitter settings, so unchanged input is not split again.
+    Raises FileNotFoundError if path does not exist.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+
+    params = f"{path}|{chunk_size}|{overlap}|{TextSplitter is not None}"
+    key = hashlib.blake2b(data + params.encode(), digest_size=16).hexdigest()
+    cache_path = f".chunks_{key}.pkl"
+    try:
+        with open(cache_path, "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        pass
+
+    chunks = _split(data.decode("utf-8"), chunk_size, overlap)
+    documents = [
+        Document(page_content=chunk, metadata={"source": path}) for chunk in chunks
+    ]
+
+    # Write to a temp file first so a crash never leaves a partial pickle
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(documents, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, cache_path)
+    return documents
+
+
+def add_documents_in_batches(
+    db: VectorStore,
+    documents: List[Document],
+    batch_size: int = INGEST_BATCH_SIZE,
+    max_workers: int = INGEST_WORKERS,
+) -> None:
+    """Embed and add documents to db in fixed-size batches on a thread pool.
+
+    Embedding is I/O-bound, so the requests for several batches overlap
+    while earlier batches are inserted.
+    """
+    batches = [
+        documents[i : i + batch_size] for i in range(0, len(documents), batch_size)
+    ]
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        # list() re-raises the first failure from any batch
+        list(pool.map(db.add_documents, batches))
+
+
+def open_fact_store(
+    persist_dir: str,
+    embeddings: Embeddings,
+    embedding_type: str,
+    path: str = "facts.txt",
+    dtype: Optional[str] = None,
+) -> Chroma:
+    """Open the Chroma store in persist_dir, rebuilding it only when stale.
+
+    The store is reused as is while its manifest matches the source file's
+    mtime and size, the chunking settings and the embedding type and dtype
+    (see config.embeddings.embedding_dtype). Otherwise
+    the directory is wiped, path is chunked and embedded into a fresh store
+    and the manifest is rewritten. Raises FileNotFoundError if path does not
+    exist.
+    """
+    stat = os.stat(path)
+    manifest = {
+        "source": path,
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "chunk_size": CHUNK_SIZE,
+        "overlap": CHUNK_OVERLAP,
+        "embedding": embedding_type,
+        "dtype": dtype,
+    }
+    manifest_path = os.path.join(persist_dir, MANIFEST_FILE)
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            if json.load(f) == manifest:
+                return Chroma(
+                    persist_directory=persist_dir, embedding_function=embeddings
+                )
+    except (OSError, ValueError):
+        pass
+
+    shutil.rmtree(persist_dir, ignore_errors=True)
+    db = Chroma(persist_directory=persist_dir, embedding_function=embeddings)
+    documents = load_fact_chunks(path)
+    print(f"Loaded {len(documents)} document chunks")
+    add_documents_in_batches(db, documents)
+
+    # Written last, so an interrupted build is redone on the next run
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    return db
+
+
+class FactIndex:
+    """In-memory cosine search over every vector of a Chroma store.
+
+    The facts corpus is small, so scoring one query against a matrix is
+    cheaper than a Chroma query round trip. Vectors are kept as float16,
+    half the memory of Chroma's float32, and, given cache_path, saved there
+    so later runs skip reading the embeddings out of Chroma. Stores of at
+    least HNSW_MIN_VECTORS vectors are searched approximately through a
+    usearch HNSW index when usearch is installed. Build it after the store
+    is filled; documents added later are not seen.
+    """
+
+    def __init__(self, db, embeddings: Embeddings, cache_path: Optional[str] = None):
+        self.embeddings = embeddings
+        data = db.get(include=["documents", "metadatas"])
+        self.documents = [
+            Document(page_content=text, metadata=meta or {})
+            for text, meta in zip(data["documents"], data["metadatas"])
+        ]
+
+        matrix = None
+        if cache_path is not None and os.path.exists(cache_path):
+            with np.load(cache_path) as cached:
+                # Only trust the cache if the store still holds the same ids
+                if cached["ids"].tolist() == data["ids"]:
+                    matrix = cached["matrix"]
+        cache_valid = matrix is not None
+
+        if matrix is None:
+            fetched = db.get(ids=data["ids"], include=["embeddings"])
+            # Chroma does not promise to return rows in the order of ids, so
+            # line the vectors up with the documents by id
+            by_id = dict(zip(fetched["ids"], fetched["embeddings"]))
+            vectors = [by_id[doc_id] for doc_id in data["ids"]]
+            matrix = np.asarray(vectors, dtype=np.float32)
+            if matrix.size:
+                norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+                matrix /= np.maximum(norms, 1e-12)
+            matrix = matrix.astype(np.float16)
+            if cache_path is not None:
+                np.savez(cache_path, ids=np.asarray(data["ids"]), matrix=matrix)
+        self.matrix = matrix
+
+        self.hnsw = None
+        if HnswIndex is not None and len(matrix) >= HNSW_MIN_VECTORS:
+            hnsw_path = None
+            if cache_path is not None:
+                hnsw_path = os.path.splitext(cache_path)[0] + ".usearch"
+            self.hnsw = self._load_hnsw(matrix, hnsw_path, cache_valid)
+
+    @staticmethod
+    def _load_hnsw(matrix: np.ndarray, path: Optional[str], reuse: bool):
+        """Restore the HNSW index from path if reuse is set, else build it."""
+        if reuse and path is not None and os.path.exists(path):
+            index = HnswIndex.restore(path)
+            if index is not None and len(index) == len(matrix):
+                return index
+
+        index = HnswIndex(ndim=matrix.shape[1], metric="cos", dtype="f16")
+        index.add(np.arange(len(matrix)), matrix)
+        if path is not None:
+            index.save(path)
+        return index
+
+    def similarity_search(self, query: str, k: int = 3) -> List[Document]:
+        """Return the k documents most similar to query, best first."""
+        return self.similarity_search_by_vector(self.embeddings.embed_query(query), k)
+
+    def similarity_search_by_vector(
+        self, embedding: List[float], k: int = 3
+    ) -> List[Document]:
+        """Return the k documents most similar to an embedded query, best first."""
+        k = min(k, len(self.documents))
+        if k <= 0:
+            return []
+
+        # The rows are unit length, so once the query is too, cosine
+        # similarity is a plain dot product with no per-row norms
+        vector = np.asarray(embedding, dtype=np.float32)
+        vector /= max(float(np.linalg.norm(vector)), 1e-12)
+        if self.hnsw is not None:
+            # Approximate: O(log N) graph search instead of scoring every row
+            matches = self.hnsw.search(vector, k)
+            return [self.documents[int(key)] for key in matches.keys]
+
+        if simsimd is not None:
+            # float16 dot kernel; negate so that smaller is better
+            query16 = vector.astype(np.float16)[None, :]
+            scores = -np.asarray(simsimd.cdist(query16, self.matrix, "dot"))
+            scores = scores.ravel()
+        else:
+            # NumPy has no fast float16 matmul, so dequantize for the product
+            scores = -(self.matrix.astype(np.float32) @ vector)
+
+        # argpartition finds the top k without sorting every score
+        best = np.argpartition(scores, k - 1)[:k]
+        best = best[np.argsort(scores[best])]
+        return [self.documents[i] for i in best]
@@ -1,12 +1,15 @@
 from dotenv import load_dotenv
-from langchain_community.document_loaders import TextLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_chroma import Chroma
 import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config.embeddings import get_embeddings
+from config.embeddings import embedding_dtype, get_cached_embeddings, get_embeddings
+from utilities.fact_chunks import (
+    FACT_INDEX_FILE,
+    FactIndex,
+    open_fact_store,
+)
 
 
 def main(embedding_type="openai"):
@@ -17,32 +20,24 @@ def main(embedding_type="openai"):
     if embedding_type == "openai" and not os.getenv("OPENAI_API_KEY"):
         raise ValueError("OPENAI_API_KEY not found in environment variables")
 
-    # Initialize embeddings
-    embeddings = get_embeddings(embedding_type)
-
-    # Use RecursiveCharacterTextSplitter for better chunking
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=500,  # Larger chunks often work better
-        chunk_overlap=50,  # Some overlap helps maintain context
-        separators=["\n\n", "\n", ".", "!", "?", ",", " ", ""],
-    )
+    # Initialize embeddings, cached on disk so unchanged chunks are not re-embedded
+    embeddings = get_cached_embeddings(embedding_type)
 
-    # Load and split documents
+    # Open the vector database, only re-embedding facts.txt when it or the
+    # chunking settings changed since the store was built
+    persist_dir = f"emb_{embedding_type}"
     try:
-        loader = TextLoader("facts.txt", encoding="utf-8")
-        documents = loader.load_and_split(text_splitter)
-        print(f"Loaded {len(documents)} document chunks")
+        db = open_fact_store(
+            persist_dir,
+            embeddings,
+            embedding_type,
+            "facts.txt",
+            embedding_dtype(embedding_type),
+        )
     except FileNotFoundError:
         print("Error: facts.txt file not found")
         return
 
-    # Create or load existing vector database
-    # Note: Chroma 0.4.x automatically persists documents
-    persist_dir = f"emb_{embedding_type}"
-    db = Chroma.from_documents(
-        documents, embedding=embeddings, persist_directory=persist_dir
-    )
-
     # Search for similar documents
     query = "What is an interesting fact about the English language?"
     results = db.similarity_search(query, k=3)  # Get top 3 result
@@ -70,7 +65,8 @@ def search_existing_db(query: str, embedding_type="openai"):
     persist_dir = f"emb_{embedding_type}"
     db = Chroma(persist_directory=persist_dir, embedding_function=embeddings)
 
-    results = db.similarity_search(query, k=3)
+    index = FactIndex(db, embeddings, os.path.join(persist_dir, FACT_INDEX_FILE))
+    results = index.similarity_search(query, k=3)
 
     print(f"\nQuery: {query}")
     print("=" * 50)
@@ -1,12 +1,11 @@
+import functools
 import random
 import sys
 from dotenv import load_dotenv
-from langchain_community.document_loaders import TextLoader
-from langchain.text_splitter import CharacterTextSplitter
-from langchain_chroma import Chroma
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config.embeddings import get_embeddings
+from config.embeddings import embedding_dtype, get_cached_embeddings
+from utilities.fact_chunks import FactIndex, open_fact_store
 from rich.console import Console
 from rich.panel import Panel
 from rich.text import Text
@@ -19,20 +18,18 @@ import time
 console = Console(force_terminal=True, legacy_windows=False)
 
 
-def print_welcome():
-    """Display welcome message with colorful ASCII art"""
-    welcome_text = Text()
-    welcome_text.append("[*] ", style="bright_blue")
-    welcome_text.append("FASCINATING FACTS CHAT", style="bold bright_cyan")
-    welcome_text.append(" [*]", style="bright_blue")
-
-    panel = Panel(welcome_text, box=box.DOUBLE, style="bright_cyan", padding=(1, 2))
-    console.print(panel)
-    console.print()
+def _build_welcome_panel():
+    """Build the welcome message panel with colorful ASCII art"""
+    welcome_text = Text.assemble(
+        ("[*] ", "bright_blue"),
+        ("FASCINATING FACTS CHAT", "bold bright_cyan"),
+        (" [*]", "bright_blue"),
+    )
+    return Panel(welcome_text, box=box.DOUBLE, style="bright_cyan", padding=(1, 2))
 
 
-def print_instructions():
-    """Display usage instructions"""
+def _build_instructions_panel():
+    """Build the usage instructions panel"""
     instructions = Text()
     instructions.append(
         "[>] Ask me anything about the fascinating facts I know!\n\n",
@@ -57,14 +54,29 @@ def print_instructions():
         style="bright_white",
     )
 
-    panel = Panel(
+    return Panel(
         instructions,
         title="How to Use",
         box=box.ROUNDED,
         style="bright_green",
         padding=(1, 2),
     )
-    console.print(panel)
+
+
+# The welcome and instructions never change, so build their panels once
+_WELCOME_PANEL = _build_welcome_panel()
+_INSTRUCTIONS_PANEL = _build_instructions_panel()
+
+
+def print_welcome():
+    """Display welcome message with colorful ASCII art"""
+    console.print(_WELCOME_PANEL)
+    console.print()
+
+
+def print_instructions():
+    """Display usage instructions"""
+    console.print(_INSTRUCTIONS_PANEL)
     console.print()
 
 
@@ -102,25 +114,27 @@ def display_suggestions():
     console.print()
 
 
-def get_random_facts(db, num_facts=3):
-    """Get random facts from the database"""
-    random_queries = [
-        "animals",
-        "space",
-        "food",
-        "history",
-        "science",
-        "geography",
-        "technology",
-        "nature",
-        "human body",
-        "sports",
-        "art",
-        "music",
-    ]
-    query = random.choice(random_queries)
-    results = db.similarity_search(query, k=num_facts)
-    return results
+# Topics the "random" command picks from; embedded once at startup
+RANDOM_QUERIES = [
+    "animals",
+    "space",
+    "food",
+    "history",
+    "science",
+    "geography",
+    "technology",
+    "nature",
+    "human body",
+    "sports",
+    "art",
+    "music",
+]
+
+
+def get_random_facts(index, query_vectors, num_facts=3):
+    """Get random facts from the index using a pre-embedded topic"""
+    vector = query_vectors[random.choice(RANDOM_QUERIES)]
+    return index.similarity_search_by_vector(vector, k=num_facts)
 
 
 def format_results(results, query_type="search"):
@@ -132,6 +146,9 @@ def format_results(results, query_type="search"):
         )
         return
 
+    # Optional pause between facts for dramatic effect, off by default
+    delay = float(os.getenv("FACTS_TYPING_DELAY", "0"))
+
     icon = "[*]" if query_type == "random" else "[>]"
     title = "Random Facts" if query_type == "random" else "Here's what I found"
 
@@ -140,15 +157,16 @@ def format_results(results, query_type="search"):
     for i, result in enumerate(results, 1):
         fact_text = result.page_content.strip()
 
-        # Create styled text
-        styled_fact = Text()
-        styled_fact.append(f"  {i}. ", style="bright_cyan bold")
-        styled_fact.append(fact_text, style="bright_white")
+        # Create styled text in one step
+        styled_fact = Text.assemble(
+            (f"  {i}. ", "bright_cyan bold"), (fact_text, "bright_white")
+        )
 
         # Create panel for each fact
         panel = Panel(styled_fact, box=box.SIMPLE, style="bright_blue", padding=(0, 1))
         console.print(panel)
-        time.sleep(0.3)  # Small delay for dramatic effect
+        if delay:
+            time.sleep(delay)
 
     console.print()
 
@@ -164,23 +182,31 @@ def main(embedding_type="openai"):
             "[bold bright_cyan]Loading fascinating facts database...[/bold bright_cyan]"
         )
 
-        # Initialize the embeddings
-        embeddings = get_embeddings(embedding_type)
+        # Initialize the embeddings, cached on disk across runs
+        embeddings = get_cached_embeddings(embedding_type)
 
-        # Initialize the text splitter
-        text_splitter = CharacterTextSplitter(
-            separator="\n", chunk_size=200, chunk_overlap=0
+        # Open the facts database, only re-embedding facts.txt when it changed
+        db = open_fact_store(
+            f"emb_{embedding_type}",
+            embeddings,
+            embedding_type,
+            "facts.txt",
+            embedding_dtype(embedding_type),
         )
 
-        # Load and split the documents
-        loader = TextLoader("facts.txt")
-        documents = loader.load_and_split(text_splitter)
+        # Load every vector into memory once for fast per-query search
+        index = FactIndex(db, embeddings)
 
-        # Embed and store the documents
-        db = Chroma.from_documents(
-            documents, embedding=embeddings, persist_directory=f"emb_{embedding_type}"
+        # Embed the random topics in one call so "random" never hits the API
+        random_vectors = dict(
+            zip(RANDOM_QUERIES, embeddings.embed_documents(RANDOM_QUERIES))
         )
 
+        # Repeated questions reuse their embedding instead of another API call
+        @functools.lru_cache(maxsize=512)
+        def embed_query(query):
+            return tuple(embeddings.embed_query(query))
+
         console.print(
             "[OK] [bold bright_green]Database loaded successfully![/bold bright_green]\n"
         )
@@ -218,7 +244,7 @@ def main(embedding_type="openai"):
                     console.print(
                         "[bold bright_cyan]Finding random fascinating facts...[/bold bright_cyan]"
                     )
-                    results = get_random_facts(db)
+                    results = get_random_facts(index, random_vectors)
                     format_results(results, "random")
                     continue
 
@@ -226,7 +252,7 @@ def main(embedding_type="openai"):
                 console.print(
                     f"[bold bright_cyan]Searching for facts about '{query}'...[/bold bright_cyan]"
                 )
-                results = db.similarity_search(query, k=4)
+                results = index.similarity_search_by_vector(embed_query(query), k=4)
 
                 format_results(results)
 
@@ -1,45 +1,40 @@
 from dotenv import load_dotenv
-from langchain_community.document_loaders import TextLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_chroma import Chroma
 import sys
 import os
 import shutil
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config.embeddings import get_embeddings
+from config.embeddings import embedding_dtype, get_cached_embeddings, get_embeddings
+from utilities.fact_chunks import (
+    FACT_INDEX_FILE,
+    FactIndex,
+    open_fact_store,
+)
 
 
 def main(embedding_type="local"):
     # Load environment variables
     load_dotenv()
 
-    # Initialize embeddings
-    embeddings = get_embeddings(embedding_type)
+    # Initialize embeddings, cached on disk so unchanged chunks are not re-embedded
+    embeddings = get_cached_embeddings(embedding_type)
 
-    # Use RecursiveCharacterTextSplitter for better chunking
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=500,
-        chunk_overlap=50,
-        separators=["\n\n", "\n", ".", "!", "?", ",", " ", ""],
-    )
+    # Use directory based on embedding type
+    persist_dir = f"emb_{embedding_type}"
 
-    # Load and split documents
+    # Open the vector database, rebuilding it only when facts.txt changed
     try:
-        loader = TextLoader("facts.txt", encoding="utf-8")
-        documents = loader.load_and_split(text_splitter)
-        print(f"Loaded {len(documents)} document chunks")
+        db = open_fact_store(
+            persist_dir,
+            embeddings,
+            embedding_type,
+            "facts.txt",
+            embedding_dtype(embedding_type),
+        )
     except FileNotFoundError:
         print("Error: facts.txt file not found")
         return
 
-    # Use directory based on embedding type
-    persist_dir = f"emb_{embedding_type}"
-
-    # Create vector database with embeddings
-    db = Chroma.from_documents(
-        documents, embedding=embeddings, persist_directory=persist_dir
-    )
-
     # Search for similar documents
     query = "What is an interesting fact about the English language?"
     results = db.similarity_search(query, k=3)
@@ -66,7 +61,8 @@ def search_existing_db(query: str, embedding_type="local"):
     persist_dir = f"emb_{embedding_type}"
     try:
         db = Chroma(persist_directory=persist_dir, embedding_function=embeddings)
-        results = db.similarity_search(query, k=3)
+        index = FactIndex(db, embeddings, os.path.join(persist_dir, FACT_INDEX_FILE))
+        results = index.similarity_search(query, k=3)
 
         print(f"\nQuery: {query}")
         print("=" * 50)
@@ -84,6 +80,9 @@ if __name__ == "__main__":
     # Run the main pipeline with local embeddings (default)
     main("local")
 
+    # Example of using int8 ONNX embeddings (needs optimum[onnxruntime])
+    # main("local_onnx")
+
     # Example of using OpenAI embeddings
     # main("openai")
 
@@ -9,80 +9,74 @@ except ImportError:
     import os
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     from config import get_llm
-from langchain_core.runnables import (
-    RunnableParallel,
-    RunnablePassthrough,
-    RunnableLambda,
-)
-from langchain_core.output_parsers import StrOutputParser
+from pydantic import BaseModel, Field
 import argparse
-from operator import itemgetter
 
-parser = argparse.ArgumentParser()
-parser.add_argument("--language", type=str, default="python")
-parser.add_argument("--task", type=str, default="return the sum of two numbers")
-args = parser.parse_args()
 
-load_dotenv()
+class CodeAndTests(BaseModel):
+    """Generated function together with its unit tests"""
 
-output_parser = StrOutputParser()
+    code: str = Field(description="The function that performs the task")
+    tests: str = Field(description="Comprehensive unit tests for the function")
 
-llm = get_llm("remote")
 
-code_prompt = PromptTemplate(
+# One prompt asks for both the code and its tests, so a single LLM call
+# returns them together instead of a second call re-reading the code
+combined_prompt = PromptTemplate(
     template="""
-    You are a code generator.
-    You are given a task to generate function for {language} that will {task}.
+    You are a code generator and tester.
+    Write a function for {language} that will {task}.
+    Then write comprehensive unit tests for that function.
+    Return the function as `code` and the tests as `tests`.
     """,
     input_variables=["language", "task"],
 )
 
-test_prompt = PromptTemplate(
-    input_variables=["language", "content"],
-    template="""
-    You are a code tester.
-    You are given code in {language}:
-    {content}
 
-    Generate comprehensive unit tests for this code.
-    """,
-)
+def stream_code_and_tests(chain, inputs):
+    """Print the code, then the tests, as they stream in; return the final dict."""
+    printed = {"code": 0, "tests": 0}
+    result = {}
+    for result in chain.stream(inputs):
+        for key, title in (("code", "Generated Code"), ("tests", "Generated Tests")):
+            text = result.get(key) or ""
+            if text and not printed[key]:
+                print(f"\n{title}:")
+                print("=" * 50)
+            print(text[printed[key] :], end="", flush=True)
+            printed[key] = len(text)
+    print()
+    print("=" * 50)
+    return result
 
-# Get user input for language and task
-language = input("Enter the programming language: ")
-task = input("Enter the task description: ")
 
-# Use command line args as fallback if no input provided
-final_language = language or args.language
-final_task = task or args.task
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--language", type=str, default="python")
+    parser.add_argument("--task", type=str, default="return the sum of two numbers")
+    args = parser.parse_args()
 
-code_chain = code_prompt | llm | output_parser
-test_chain = test_prompt | llm | output_parser
+    load_dotenv()
 
+    llm = get_llm("remote")
 
-# Helper function to map code to content for test chain
-def map_code_to_content(data):
-    return {"language": data["language"], "content": data["code"]}
+    # Get user input for language and task
+    language = input("Enter the programming language: ")
+    task = input("Enter the task description: ")
 
+    # Use command line args as fallback if no input provided
+    final_language = language or args.language
+    final_task = task or args.task
 
-# Create a chain that combines code generation and test generation
-chain = (
-    # Step 1: Generate code (keeps original inputs + adds code)
-    RunnablePassthrough.assign(code=code_chain)
-    |
-    # Step 2: Generate tests (keeps everything + adds test)
-    RunnablePassthrough.assign(test=RunnableLambda(map_code_to_content) | test_chain)
-)
+    # A JSON schema (rather than the model class) makes stream() yield
+    # partial dicts, so the code is shown while the tests are still generating
+    chain = combined_prompt | llm.with_structured_output(
+        CodeAndTests.model_json_schema()
+    )
 
-# Invoke the chain with the inputs
-result = chain.invoke({"language": final_language, "task": final_task})
+    # Stream the chain with the inputs, printing each part as it arrives
+    stream_code_and_tests(chain, {"language": final_language, "task": final_task})
 
-# Format and print the output
-print("\nGenerated Code:")
-print("=" * 50)
-print(result["code"])
 
-print("\nGenerated Tests:")
-print("=" * 50)
-print(result["test"])
-print("=" * 50)
+if __name__ == "__main__":
+    main()
@@ -37,9 +37,15 @@ test_prompt = PromptTemplate(
     template="Write a test for the following {language} code:\n{code}",
 )
 
+docs_prompt = PromptTemplate(
+    input_variables=["language", "code"],
+    template="Write a docstring for the following {language} code:\n{code}",
+)
+
 # Create atomic chains
 code_chain = code_prompt | llm | output_parser
 test_chain = test_prompt | llm | output_parser
+docs_chain = docs_prompt | llm | output_parser
 
 
 # RECOMMENDED APPROACH: Enhanced RunnablePassthrough with error handling
@@ -59,6 +65,16 @@ def create_robust_sequential_chain():
             print(f"Error generating test: {e}")
             return f"# Error generating test: {e}"
 
+    def generate_docs_with_context(context):
+        """Helper function to generate a docstring with proper context"""
+        try:
+            return docs_chain.invoke(
+                {"language": context["language"], "code": context["code"]}
+            )
+        except Exception as e:
+            print(f"Error generating docstring: {e}")
+            return f"# Error generating docstring: {e}"
+
     # The main sequential chain using RunnablePassthrough
     sequential_chain = (
         # Step 1: Pass through initial inputs and generate code
@@ -67,13 +83,19 @@ def create_robust_sequential_chain():
                 {"task": x["task"], "language": x["language"]}
             )
         )
-        # Step 2: Generate test using the code from step 1
-        | RunnablePassthrough.assign(test=RunnableLambda(generate_test_with_context))
+        # Step 2: Generate test and docstring from the code of step 1. Both only
+        # need the code; assign() wraps them in a RunnableParallel, so the two
+        # LLM calls run concurrently.
+        | RunnablePassthrough.assign(
+            test=RunnableLambda(generate_test_with_context),
+            docs=RunnableLambda(generate_docs_with_context),
+        )
         # Step 3: Clean up output (optional transformation step)
         | RunnableLambda(
             lambda x: {
                 "code": x["code"].strip(),
                 "test": x["test"].strip(),
+                "docs": x["docs"].strip(),
                 "language": x["language"],
                 "task": x["task"],
             }
@@ -165,3 +187,7 @@ if __name__ == "__main__":
 
     print(">>>>>> GENERATED TEST:")
     print(result["test"])
+
+    if "docs" in result:
+        print(">>>>>> GENERATED DOCSTRING:")
+        print(result["docs"])
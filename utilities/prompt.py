@@ -64,11 +64,11 @@ prompt = ChatPromptTemplate.from_messages(
 question_answer_chain = create_stuff_documents_chain(llm, prompt)
 chain = create_retrieval_chain(retriever, question_answer_chain)
 
-# Invoke the chain
+# Stream the chain, printing the answer as it is generated
 # Note: Modern retrieval chain uses "input" instead of "query"
-result = chain.invoke(
+for chunk in chain.stream(
     {"input": "What is the interesting fact about the English language?"}
-)
-
-# Modern chain returns "answer" instead of "result"
-print(result["answer"])
+):
+    # Modern chain returns "answer" instead of "result"
+    print(chunk.get("answer", ""), end="", flush=True)
+print()
@@ -12,19 +12,17 @@ class RedundantFilterRetriever(BaseRetriever):
         emb = self.embeddings.embed_query(query)
 
         # take embeddings and feed them into that
-        # max_marginal_relevance_search_by_vector
+        # max_marginal_relevance_search_by_vector. It reads the candidates'
+        # stored embeddings from Chroma, so only the query is embedded here.
 
         return self.chroma.max_marginal_relevance_search_by_vector(
             embedding=emb, lambda_mult=0.8
         )
 
     async def _aget_relevant_documents(self, query: str):
-        # calculate embeddings for the 'query' string
-        emb = self.embeddings.embed_query(query)
+        # calculate embeddings for the 'query' string without blocking the loop
+        emb = await self.embeddings.aembed_query(query)
 
-        # take embeddings and feed them into that
-        # max_marginal_relevance_search_by_vector
-
-        return self.chroma.max_marginal_relevance_search_by_vector(
+        return await self.chroma.amax_marginal_relevance_search_by_vector(
             embedding=emb, lambda_mult=0.8
         )
@@ -1,3 +1,5 @@
+import asyncio
+import functools
 from uuid import UUID
 from dotenv import load_dotenv
 # Handle both direct execution and module import
@@ -10,7 +12,7 @@ except ImportError:
     sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     from config import get_llm
 from langchain.prompts import ChatPromptTemplate
-from langchain.callbacks.base import BaseCallbackHandler
+from langchain.callbacks.base import AsyncCallbackHandler
 import time
 
 from langchain.chains import LLMChain
@@ -20,14 +22,30 @@ from langchain_core.outputs import ChatGenerationChunk, GenerationChunk
 load_dotenv()
 
 
-class StreamHandler(BaseCallbackHandler):
-    def on_llm_new_token(self, token, **kwargs):
-        pass
+class StreamHandler(AsyncCallbackHandler):
+    """Puts each new token on a queue, then None once the LLM is done"""
+
+    def __init__(self, queue):
+        self.queue = queue
+
+    async def on_llm_new_token(self, token, **kwargs):
+        await self.queue.put(token)
+
+    async def on_llm_end(self, response, **kwargs):
+        await self.queue.put(None)
+
+    async def on_llm_error(self, error, **kwargs):
+        await self.queue.put(None)
 
 
 # Note: streaming and callbacks need to be configured separately when using get_llm
-llm = get_llm("remote")
-# llm = llm.with_callbacks([StreamHandler()])
+# Built on first use, so importing this module does not create an LLM client
+@functools.lru_cache()
+def _llm():
+    return get_llm("remote")
+
+
+# llm = _llm().with_callbacks([StreamHandler(asyncio.Queue())])
 # For streaming, you may need to configure the model appropriately
 
 prompt = ChatPromptTemplate.from_messages(
@@ -38,13 +56,40 @@ prompt = ChatPromptTemplate.from_messages(
 
 
 class StreamingChain(LLMChain):
-    def stream(self, input):
-        print("hi there")
-
-
-chainTest = StreamingChain(llm=llm, prompt=prompt)
-
-chainTest.stream("asdfasdf")
+    # Not named stream/astream, so Runnable's own streaming API keeps working
+    async def astream_tokens(self, input):
+        """Yield the reply's tokens as the LLM produces them"""
+        queue = asyncio.Queue()
+        handler = StreamHandler(queue)
+        messages = self.prompt.format_messages(content=input)
+
+        # astream makes the model emit on_llm_new_token for every chunk; the
+        # handler forwards them while this generator hands them to the caller
+        async def run():
+            async for _ in self.llm.astream(messages, config={"callbacks": [handler]}):
+                pass
+
+        task = asyncio.create_task(run())
+        # End the loop even if run() stops before the handler's end/error hooks
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+        try:
+            while (token := await queue.get()) is not None:
+                yield token
+            # Surface any error from the LLM call
+            await task
+        finally:
+            task.cancel()
+
+
+async def main():
+    chainTest = StreamingChain(llm=_llm(), prompt=prompt)
+    async for token in chainTest.astream_tokens(input("Ask anything: ")):
+        print(token, end="", flush=True)
+    print()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
 
 
 # chain = prompt | llm
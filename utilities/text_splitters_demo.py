@@ -1,8 +1,157 @@
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
 from langchain.text_splitter import (
     CharacterTextSplitter,
     RecursiveCharacterTextSplitter,
 )
 
+# Optional Hyperscan engine: scans for every separator at once with a SIMD
+# automaton; the stdlib re alternation is the fallback
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+
+class BoundedRecursiveSplitter(RecursiveCharacterTextSplitter):
+    """RecursiveCharacterTextSplitter that always terminates.
+
+    When none of the remaining separators occurs in a piece that is still
+    longer than chunk_size, the piece is cut into fixed windows (stepping
+    chunk_size - chunk_overlap) instead of being split again, so adversarial
+    input without separators can neither recurse without bound nor come
+    back as one oversized chunk.
+    """
+
+    def _split_text(self, text, separators):
+        too_long = len(text) > self._chunk_size
+        if too_long and not any(sep and sep in text for sep in separators):
+            step = max(1, self._chunk_size - self._chunk_overlap)
+            return [
+                text[i : i + self._chunk_size] for i in range(0, len(text), step)
+            ]
+        return super()._split_text(text, separators)
+
+
+class SinglePassRegexSplitter(RecursiveCharacterTextSplitter):
+    """Splitter that finds every separator boundary in one regex pass.
+
+    RecursiveCharacterTextSplitter splits again with each lower-priority
+    separator, so text may be scanned once per separator. Here all
+    non-empty separators are compiled once into a single alternation
+    (earlier separators win at the same position) and the text is scanned
+    once; pieces are then merged up to chunk_size with chunk_overlap.
+    Pieces with no separator that are still too long are cut into fixed
+    windows instead of recursing. ASCII text is scanned with Hyperscan when
+    it is installed.
+    """
+
+    def __init__(self, separators=None, **kwargs):
+        super().__init__(separators=separators, **kwargs)
+        self._patterns = [re.escape(sep) for sep in self._separators if sep]
+        self._boundary = re.compile("|".join(self._patterns))
+        # Compiled on first use; Hyperscan databases cannot be pickled
+        self._hs_db = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_hs_db"] = None
+        return state
+
+    def _hyperscan_ends(self, text):
+        """Return the end offset of every separator match, found by Hyperscan."""
+        if self._hs_db is None:
+            self._hs_db = hyperscan.Database()
+            self._hs_db.compile(
+                expressions=[p.encode() for p in self._patterns],
+                ids=list(range(len(self._patterns))),
+                flags=[hyperscan.HS_FLAG_SOM_LEFTMOST] * len(self._patterns),
+            )
+
+        # Hyperscan reports every match, overlapping ones included
+        hits = []
+
+        def on_match(pattern_id, start, end, flags, context):
+            hits.append((start, pattern_id, end))
+
+        self._hs_db.scan(text.encode("ascii"), match_event_handler=on_match)
+
+        # Keep the leftmost non-overlapping matches, preferring earlier
+        # separators at the same position, like the re alternation does
+        ends = []
+        last_end = 0
+        for start, _, end in sorted(hits):
+            if start >= last_end:
+                ends.append(end)
+                last_end = end
+        return ends
+
+    def split_text(self, text):
+        # Byte offsets only equal str offsets for ASCII text
+        if hyperscan is not None and self._patterns and text.isascii():
+            ends = self._hyperscan_ends(text)
+        else:
+            ends = [match.end() for match in self._boundary.finditer(text)]
+
+        # Cut after every separator, keeping it with the preceding piece
+        pieces = []
+        start = 0
+        for end in ends:
+            pieces.append(text[start:end])
+            start = end
+        pieces.append(text[start:])
+
+        splits = []
+        for piece in pieces:
+            if len(piece) <= self._chunk_size:
+                splits.append(piece)
+            else:
+                splits.extend(
+                    piece[i : i + self._chunk_size]
+                    for i in range(0, len(piece), self._chunk_size)
+                )
+        return self._merge_splits([s for s in splits if s], "")
+
+
+# Separator priority shared by the recursive and single-pass splitters
+SEPARATORS = ("\n\n", "\n", ".", "!", "?", ",", " ", "")
+
+
+@lru_cache(maxsize=64)
+def get_splitter(chunk_size, overlap, seps=SEPARATORS, single_pass=False):
+    """Return a shared splitter for these settings, built only on first use"""
+    if single_pass:
+        splitter_class = SinglePassRegexSplitter
+    else:
+        splitter_class = BoundedRecursiveSplitter
+    return splitter_class(
+        chunk_size=chunk_size, chunk_overlap=overlap, separators=list(seps)
+    )
+
+
+def split_with(splitter, text):
+    """Split text with splitter (a picklable target for worker processes)"""
+    return splitter.split_text(text)
+
+
+def print_chunks(title, chunks):
+    """Print every chunk in one write, followed by length statistics"""
+    lens = np.fromiter(map(len, chunks), dtype=np.int32, count=len(chunks))
+    rule = "-" * 30
+    # repr shows whitespace characters
+    block = "".join(
+        f"Chunk {i} ({n} chars):\n{chunk!r}\nReadable: {chunk.strip()}\n{rule}\n"
+        for i, (chunk, n) in enumerate(zip(chunks, lens.tolist()), 1)
+    )
+    sys.stdout.write(f"{title}\n{'=' * 50}\n{block}")
+    if len(lens):
+        print(f"Total: {lens.sum()} chars, max: {lens.max()}, mean: {lens.mean():.1f}")
+
+
 # Sample text with various separators
 sample_text = """
 Python is a high-level programming language. It was created by Guido van Rossum and first released in 1991.
@@ -18,65 +167,78 @@ Key features include:
 Python is widely used in web development, data analysis, artificial intelligence, and scientific computing.
 """
 
-print("ORIGINAL TEXT:")
-print("=" * 50)
-print(sample_text)
-print("\n")
+def main():
+    print("ORIGINAL TEXT:")
+    print("=" * 50)
+    print(sample_text)
+    print("\n")
 
-# CharacterTextSplitter - only uses newline
-char_splitter = CharacterTextSplitter(separator="\n", chunk_size=150, chunk_overlap=20)
+    # CharacterTextSplitter - only uses newline
+    char_splitter = CharacterTextSplitter(
+        separator="\n", chunk_size=150, chunk_overlap=20
+    )
 
-char_chunks = char_splitter.split_text(sample_text)
+    # RecursiveCharacterTextSplitter - tries multiple separators
+    recursive_splitter = get_splitter(150, 20)
 
-print("CHARACTER TEXT SPLITTER RESULTS:")
-print("=" * 50)
-for i, chunk in enumerate(char_chunks, 1):
-    print(f"Chunk {i} ({len(chunk)} chars):")
-    print(repr(chunk))  # repr shows whitespace characters
-    print(f"Readable: {chunk.strip()}")
-    print("-" * 30)
+    # SinglePassRegexSplitter - same separators, found in a single regex scan
+    single_pass_splitter = get_splitter(150, 20, single_pass=True)
 
-print("\n")
+    # Splitting is CPU-bound Python, so run the splitters in separate
+    # processes to compare them side by side instead of one after another
+    splitters = [char_splitter, recursive_splitter, single_pass_splitter]
+    with ProcessPoolExecutor(max_workers=len(splitters)) as executor:
+        char_chunks, recursive_chunks, single_pass_chunks = executor.map(
+            split_with, splitters, [sample_text] * len(splitters)
+        )
 
-# RecursiveCharacterTextSplitter - tries multiple separators
-recursive_splitter = RecursiveCharacterTextSplitter(
-    chunk_size=150,
-    chunk_overlap=20,
-    separators=["\n\n", "\n", ".", "!", "?", ",", " ", ""],
-)
+    print_chunks("CHARACTER TEXT SPLITTER RESULTS:", char_chunks)
+
+    print("\n")
+
+    print_chunks("RECURSIVE CHARACTER TEXT SPLITTER RESULTS:", recursive_chunks)
+
+    print("\n")
+
+    print_chunks("SINGLE-PASS REGEX SPLITTER RESULTS:", single_pass_chunks)
+
+    # Write the summary, the differences and the separator priority in one go
+    sys.stdout.write(
+        "\n".join(
+            [
+                "\n",
+                "COMPARISON SUMMARY:",
+                "=" * 50,
+                f"CharacterTextSplitter created {len(char_chunks)} chunks",
+                "RecursiveCharacterTextSplitter created "
+                f"{len(recursive_chunks)} chunks",
+                f"SinglePassRegexSplitter created {len(single_pass_chunks)} chunks",
+                # Show how each handles the same content differently
+                "\nKey differences:",
+                "- CharacterTextSplitter: May break mid-sentence if newlines don't "
+                "align well",
+                "- RecursiveCharacterTextSplitter: Tries to preserve "
+                "sentence/paragraph boundaries",
+                "- SinglePassRegexSplitter: One scan for all separators, then packs "
+                "pieces up to the chunk size",
+                # Demonstrate the separator priority
+                "\n" + "=" * 50,
+                "RECURSIVE SPLITTER SEPARATOR PRIORITY:",
+                "=" * 50,
+                "1. \\n\\n  (paragraph breaks)",
+                "2. \\n    (line breaks)",
+                "3. .     (sentence endings)",
+                "4. !     (exclamations)",
+                "5. ?     (questions)",
+                "6. ,     (commas)",
+                "7. ' '   (spaces)",
+                "8. ''    (character by character - last resort)",
+            ]
+        )
+        + "\n"
+    )
 
-recursive_chunks = recursive_splitter.split_text(sample_text)
-
-print("RECURSIVE CHARACTER TEXT SPLITTER RESULTS:")
-print("=" * 50)
-for i, chunk in enumerate(recursive_chunks, 1):
-    print(f"Chunk {i} ({len(chunk)} chars):")
-    print(repr(chunk))  # repr shows whitespace characters
-    print(f"Readable: {chunk.strip()}")
-    print("-" * 30)
-
-print("\n")
-print("COMPARISON SUMMARY:")
-print("=" * 50)
-print(f"CharacterTextSplitter created {len(char_chunks)} chunks")
-print(f"RecursiveCharacterTextSplitter created {len(recursive_chunks)} chunks")
-
-# Show how each handles the same content differently
-print("\nKey differences:")
-print("- CharacterTextSplitter: May break mid-sentence if newlines don't align well")
-print(
-    "- RecursiveCharacterTextSplitter: Tries to preserve sentence/paragraph boundaries"
-)
 
-# Demonstrate the separator priority
-print("\n" + "=" * 50)
-print("RECURSIVE SPLITTER SEPARATOR PRIORITY:")
-print("=" * 50)
-print("1. \\n\\n  (paragraph breaks)")
-print("2. \\n    (line breaks)")
-print("3. .     (sentence endings)")
-print("4. !     (exclamations)")
-print("5. ?     (questions)")
-print("6. ,     (commas)")
-print("7. ' '   (spaces)")
-print("8. ''    (character by character - last resort)")
+# Worker processes re-import this module, so only run the demo directly
+if __name__ == "__main__":
+    main()